@@ -3,13 +3,21 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-import plotly.express as px
 from plotly.subplots import make_subplots
-import requests
-import json
 from datetime import datetime, timedelta
-import time
 from streamlit.components.v1 import html
+from weather_sources import SyntheticWeatherSource, create_data_source
+from wind_scales import BEAUFORT_SIMPLIFIED
+from stations import RISK_LEVELS, assess_station_risks, network_latitude, station_alerts, station_metrics
+from alert_rules import AlertEngine, default_rules
+from pressure_tendency import PressureTendency
+from figure_cache import figure_cache, next_data_version
+from downsampling import DEFAULT_CHART_WIDTH, downsample, point_budget
+from timeseries import TimeIndexedStore, add_calendar_columns
+from schema import apply_schema
+from refresh_worker import RefreshWorker, refresh_period
+from profiling import profiler
+from metrics import reruns, start_metrics_server, timed_refresh, watch_worker
 
 # Configuration de la page
 st.set_page_config(
@@ -66,15 +74,64 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Catégories de l'évaluation des risques (catégories des règles d'alerte): icône, libellé par défaut
+RISK_CATEGORIES = {
+    'wind': ("💨", "Vent"),
+    'rain': ("🌧️", "Précipitations"),
+    'temperature': ("🌡️", "Température"),
+}
+
 class AdvancedWeatherAnalytics:
-    def __init__(self):
-        self.weather_data = self.generate_sample_data()
+    def __init__(self, source=None, n_stations=50, days_back=7, days_forward=3):
+        self.days_back = days_back
+        self.days_forward = days_forward
+        # Source de données: générateur simulé par défaut, ou flux HTTP réel
+        self.source = source or SyntheticWeatherSource(self.generate_sample_data, n_stations=n_stations,
+                                                       days_back=days_back, days_forward=days_forward)
+        observations = self.source.fetch_observations()
+        # Série indexée par date: chaque période d'analyse est une tranche de l'index
+        self.store = TimeIndexedStore(self.load_weather_data(observations))
+        self.weather_data = self.store.frame
+        # Heure de référence séparant observations et prévisions
+        self.reference_time = pd.Timestamp.now().floor('h')
+        # Tendances barométriques: observations intégrées une à une jusqu'à l'heure de référence
+        self.pressure_tendency = PressureTendency([self.source.primary_station], latitude=network_latitude())
+        observed = self.store.window(end=self.reference_time)
+        self.pressure_tendency.update(observed.index, observed['pressure'].to_numpy())
+        # Réseau complet: bloc station × temps × variable
+        self.stations = self.source.fetch_station_array(observations)
         self.storm_tracks = self.generate_storm_data()
+        # Version du jeu de données, utilisée comme clé du cache de figures
+        self.data_version = next_data_version()
         
+    def cached_figure(self, panel, builder, *params):
+        """Figure d'un panneau, reconstruite uniquement si les données ou les paramètres changent"""
+        return figure_cache.get_or_build((panel, self.data_version) + params, lambda: builder(*params))
+    
+    def get_period_data(self, period):
+        """Observations de la période d'analyse jusqu'à l'heure de référence (tranche sans copie)"""
+        return self.store.last(period, end=self.reference_time)
+    
+    def get_forecast_data(self, horizon):
+        """Prévisions sur `horizon` après l'heure de référence (tranche sans copie)"""
+        return self.store.next(horizon, self.reference_time)
+    
+    def observed_span(self):
+        """Durée d'observations disponible avant l'heure de référence"""
+        return self.reference_time - self.weather_data['datetime'].iloc[0]
+    
+    def get_current_data(self):
+        """Dernière observation à l'heure de référence"""
+        return self.weather_data.iloc[max(self.store.position(self.reference_time) - 1, 0)]
+    
+    def load_weather_data(self, observations):
+        """Extrait la série de la station principale, enrichie et convertie au schéma compact"""
+        return apply_schema(add_calendar_columns(observations[self.source.primary_station]))
+    
     def generate_sample_data(self):
         """Génère des données météorologiques simulées réalistes"""
-        dates = pd.date_range(start=datetime.now() - timedelta(days=7), 
-                             end=datetime.now() + timedelta(days=3), freq='H')
+        dates = pd.date_range(start=datetime.now() - timedelta(days=self.days_back), 
+                             end=datetime.now() + timedelta(days=self.days_forward), freq='H')
         
         data = {
             'datetime': dates,
@@ -93,45 +150,54 @@ class AdvancedWeatherAnalytics:
         
         return pd.DataFrame(data)
     
-    def generate_storm_data(self):
-        """Génère des données de suivi de tempêtes simulées"""
-        storms = []
-        for i in range(3):
-            storm_start = datetime.now() - timedelta(hours=np.random.randint(6, 48))
-            track_points = []
-            
-            lat, lon = np.random.uniform(-20, 20), np.random.uniform(40, 80)
-            for j in range(12):
-                track_points.append({
-                    'datetime': storm_start + timedelta(hours=j*6),
-                    'lat': lat + np.random.uniform(-1, 1),
-                    'lon': lon + np.random.uniform(-1, 1),
-                    'intensity': np.random.uniform(30, 120),
-                    'category': self.get_storm_category(np.random.uniform(30, 120))
-                })
-            storms.append({
-                'name': f"STORM-{chr(65+i)}",
-                'track': track_points
-            })
-        return storms
+    def generate_storm_data(self, n_storms=3, n_points=12):
+        """Génère des données de suivi de tempêtes simulées (un DataFrame indexé par tempête)"""
+        names = np.array([f"STORM-{chr(65 + i % 26)}{i // 26 or ''}" for i in range(n_storms)])
+        
+        # Position de référence de chaque tempête, puis dispersion autour de celle-ci
+        lat0 = np.random.uniform(-20, 20, n_storms)
+        lon0 = np.random.uniform(40, 80, n_storms)
+        lats = lat0[:, None] + np.random.uniform(-1, 1, (n_storms, n_points))
+        lons = lon0[:, None] + np.random.uniform(-1, 1, (n_storms, n_points))
+        
+        # Un point toutes les 6 heures depuis le début de chaque tempête
+        starts = np.datetime64(datetime.now()) - np.random.randint(6, 48, n_storms).astype('timedelta64[h]')
+        times = starts[:, None] + (np.arange(n_points) * 6).astype('timedelta64[h]')
+        
+        intensity = np.random.uniform(30, 120, n_storms * n_points)
+        tracks = pd.DataFrame({
+            'datetime': times.ravel(),
+            'lat': lats.ravel(),
+            'lon': lons.ravel(),
+            'intensity': intensity,
+            'category': self.get_storm_categories(intensity)
+        }, index=pd.Index(np.repeat(names, n_points), name='storm'))
+        return tracks.sort_index(kind='stable')
+    
+    def get_storm_track(self, name):
+        """Trajectoire d'une tempête (tranche de l'index trié, sans parcours complet)"""
+        return self.storm_tracks.loc[[name]]
+    
+    def get_current_storm_states(self):
+        """Dernier point de chaque tempête"""
+        return self.storm_tracks.groupby(level='storm', sort=False).tail(1)
     
     def get_storm_category(self, wind_speed):
         """Catégorise les tempêtes selon l'échelle de Beaufort"""
-        if wind_speed >= 118:
-            return "Ouragan"
-        elif wind_speed >= 89:
-            return "Tempête Violente"
-        elif wind_speed >= 63:
-            return "Tempête"
-        elif wind_speed >= 50:
-            return "Coup de vent"
-        else:
-            return "Vent fort"
+        return BEAUFORT_SIMPLIFIED.label(wind_speed)
+    
+    def get_storm_categories(self, wind_speeds):
+        """Version vectorisée de get_storm_category"""
+        return BEAUFORT_SIMPLIFIED.classify(wind_speeds)
     
     def create_weather_metrics(self):
         """Crée les métriques météorologiques principales"""
-        current = self.weather_data.iloc[-1]
-        previous = self.weather_data.iloc[-2]
+        latest = self.get_period_data(timedelta(hours=2))
+        if latest.empty:
+            # Trou dans le flux (ou heure de référence antérieure aux données): dernière observation connue
+            current = previous = self.get_current_data()
+        else:
+            current, previous = latest.iloc[-1], latest.iloc[0]
         
         col1, col2, col3, col4, col5 = st.columns(5)
         
@@ -158,24 +224,44 @@ class AdvancedWeatherAnalytics:
             st.metric("🌧️ Précipitation", f"{current['precipitation']:.1f} mm/h",
                      f"{(current['precipitation'] - previous['precipitation']):+.1f} mm")
     
-    def create_temperature_analysis(self):
+    def create_temperature_analysis(self, period=timedelta(hours=24)):
         """Analyse avancée des températures"""
         st.markdown("### 🌡️ Analyse des Températures")
         
+        fig = self.cached_figure('temperature', self.build_temperature_figure, period)
+        
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Statistiques de température
+        col1, col2, col3, col4 = st.columns(4)
+        temp_data = self.get_period_data(period)['temperature']
+        
+        with col1:
+            st.metric(f"Max {format_period(period)}", f"{temp_data.max():.1f}°C")
+        with col2:
+            st.metric(f"Min {format_period(period)}", f"{temp_data.min():.1f}°C")
+        with col3:
+            st.metric("Moyenne", f"{temp_data.mean():.1f}°C")
+        with col4:
+            st.metric("Écart-type", f"{temp_data.std():.1f}°C")
+    
+    def build_temperature_figure(self, period, width=DEFAULT_CHART_WIDTH):
+        """Figure d'évolution et de cycle journalier des températures"""
+        data = self.get_period_data(period)
         fig = make_subplots(rows=2, cols=1, 
                            subplot_titles=('Évolution Température', 'Cycle Journalier'),
                            vertical_spacing=0.1)
         
-        # Graphique d'évolution
+        # Graphique d'évolution (réduit à la résolution du graphique)
+        evolution = downsample(data, 'temperature', point_budget(width))
         fig.add_trace(
-            go.Scatter(x=self.weather_data['datetime'], y=self.weather_data['temperature'],
+            go.Scatter(x=evolution['datetime'], y=evolution['temperature'],
                       name='Température', line=dict(color='red', width=2)),
             row=1, col=1
         )
         
-        # Cycle journalier
-        self.weather_data['hour'] = self.weather_data['datetime'].dt.hour
-        daily_cycle = self.weather_data.groupby('hour')['temperature'].mean()
+        # Cycle journalier moyen de la période (heure précalculée à l'ingestion)
+        daily_cycle = data.groupby('hour')['temperature'].mean()
         
         fig.add_trace(
             go.Scatter(x=daily_cycle.index, y=daily_cycle.values,
@@ -184,32 +270,21 @@ class AdvancedWeatherAnalytics:
         )
         
         fig.update_layout(height=400, showlegend=False)
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Statistiques de température
-        col1, col2, col3, col4 = st.columns(4)
-        temp_data = self.weather_data['temperature']
-        
-        with col1:
-            st.metric("Max 24h", f"{temp_data[-24:].max():.1f}°C")
-        with col2:
-            st.metric("Min 24h", f"{temp_data[-24:].min():.1f}°C")
-        with col3:
-            st.metric("Moyenne", f"{temp_data.mean():.1f}°C")
-        with col4:
-            st.metric("Écart-type", f"{temp_data.std():.1f}°C")
+        return fig
     
-    def create_wind_analysis(self):
+    def create_wind_analysis(self, period=timedelta(hours=24)):
         """Analyse avancée du vent"""
         st.markdown("### 💨 Analyse des Vents")
         
         # Graphique de rose des vents
-        recent_data = self.weather_data.tail(24)
+        recent_data = self.get_period_data(period)
         
+        # Import différé: plotly.express coûte ~0,7 s au démarrage pour un seul graphique
+        import plotly.express as px
         fig = px.scatter_polar(recent_data, r='wind_speed', theta='wind_direction',
                               color='wind_speed', size='wind_speed',
                               color_continuous_scale='viridis',
-                              title='Rose des Vents (24h)')
+                              title=f'Rose des Vents ({format_period(period)})')
         
         st.plotly_chart(fig, use_container_width=True)
         
@@ -228,81 +303,78 @@ class AdvancedWeatherAnalytics:
             dominant_dir = recent_data['wind_direction'].mode().iloc[0] if not recent_data['wind_direction'].mode().empty else 0
             st.metric("Direction Dominante", f"{dominant_dir:.0f}°")
     
-    def create_pressure_analysis(self):
+    def create_pressure_analysis(self, period=timedelta(hours=24)):
         """Analyse des tendances de pression"""
         st.markdown("### 📊 Analyse Barométrique")
         
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatter(x=self.weather_data['datetime'], 
-                                y=self.weather_data['pressure'],
-                                name='Pression', line=dict(color='blue', width=2)))
-        
-        # Ajouter une ligne de tendance
-        z = np.polyfit(range(len(self.weather_data)), self.weather_data['pressure'], 1)
-        p = np.poly1d(z)
-        fig.add_trace(go.Scatter(x=self.weather_data['datetime'], 
-                                y=p(range(len(self.weather_data))),
-                                name='Tendance', line=dict(color='red', dash='dash')))
-        
-        fig.update_layout(title='Évolution de la Pression Atmosphérique',
-                         yaxis_title='Pression (hPa)')
+        fig = self.cached_figure('pressure', self.build_pressure_figure, period)
         
         st.plotly_chart(fig, use_container_width=True)
         
-        # Alertes de pression
-        current_pressure = self.weather_data['pressure'].iloc[-1]
-        pressure_change = self.weather_data['pressure'].iloc[-1] - self.weather_data['pressure'].iloc[-6]
+        # Tendances sur 3 h / 6 h / 24 h (régressions glissantes tenues à jour en flux)
+        tendency = self.pressure_tendency.table().iloc[0]
+        col1, col2, col3 = st.columns(3)
+        for col, window in zip((col1, col2, col3), self.pressure_tendency.windows):
+            with col:
+                st.metric(f"Tendance {window}", f"{tendency[f'tendency_{window}']:+.1f} hPa")
         
-        if pressure_change < -5:
+        if tendency['explosive']:
+            st.markdown(f'<div class="alert-warning">🌀 Creusement explosif - {tendency["tendency_24h"]:+.1f} hPa en 24 h</div>', 
+                       unsafe_allow_html=True)
+        elif tendency['warning']:
+            st.markdown('<div class="alert-warning">🌀 Baisse sur 6 h compatible avec un creusement explosif</div>', 
+                       unsafe_allow_html=True)
+        elif tendency['tendency_6h'] < -5:
             st.markdown('<div class="alert-warning">⚠️ Chute rapide de pression - Risque de détérioration météo</div>', 
                        unsafe_allow_html=True)
-        elif pressure_change > 5:
+        elif tendency['tendency_6h'] > 5:
             st.markdown('<div class="alert-info">📈 Hausse de pression - Amélioration météo attendue</div>', 
                        unsafe_allow_html=True)
+        
+        if self.pressure_tendency.events:
+            last = self.pressure_tendency.events[-1]
+            st.caption(f"{len(self.pressure_tendency.events)} épisode(s) de creusement explosif détecté(s), "
+                       f"dernier le {last['time']:%d/%m à %Hh} ({last['tendency_24h']:+.1f} hPa / 24 h)")
+    
+    def build_pressure_figure(self, period, width=DEFAULT_CHART_WIDTH):
+        """Figure d'évolution et de tendance de la pression"""
+        data = self.get_period_data(period)
+        fig = go.Figure()
+        
+        # Réduction min-max: les chutes de pression restent visibles
+        pressure = downsample(data, 'pressure', point_budget(width), method='minmax')
+        fig.add_trace(go.Scatter(x=pressure['datetime'], 
+                                y=pressure['pressure'],
+                                name='Pression', line=dict(color='blue', width=2)))
+        
+        # Droite de tendance sur 24 h, tenue à jour en flux (ses deux extrémités suffisent)
+        line = self.pressure_tendency.trend_line('24h')
+        if line is not None:
+            fig.add_trace(go.Scatter(x=line[0], 
+                                    y=line[1],
+                                    name='Tendance 24 h', line=dict(color='red', dash='dash')))
+        
+        fig.update_layout(title='Évolution de la Pression Atmosphérique',
+                         yaxis_title='Pression (hPa)')
+        return fig
     
     def create_storm_tracking(self):
         """Suivi des systèmes dépressionnaires"""
         st.markdown("### 🌀 Suivi des Systèmes Dépressionnaires")
         
-        if not self.storm_tracks:
+        if self.storm_tracks.empty:
             st.info("Aucun système dépressionnaire significatif détecté")
             return
         
-        for storm in self.storm_tracks:
-            with st.expander(f"🌀 {storm['name']} - {storm['track'][-1]['category']}", expanded=True):
+        for name, track in self.storm_tracks.groupby(level='storm', sort=False):
+            current_state = track.iloc[-1]
+            with st.expander(f"🌀 {name} - {current_state['category']}", expanded=True):
                 # Créer la carte de trajectoire
-                fig = go.Figure()
-                
-                lats = [point['lat'] for point in storm['track']]
-                lons = [point['lon'] for point in storm['track']]
-                intensities = [point['intensity'] for point in storm['track']]
-                
-                fig.add_trace(go.Scattermapbox(
-                    lat=lats,
-                    lon=lons,
-                    mode='lines+markers',
-                    marker=dict(size=8, color=intensities, colorscale='Viridis',
-                               colorbar=dict(title="Intensité (km/h)")),
-                    line=dict(width=3, color='red'),
-                    text=[f"Vitesse: {intensity:.1f} km/h" for intensity in intensities],
-                    hoverinfo='text'
-                ))
-                
-                fig.update_layout(
-                    mapbox=dict(
-                        style="open-street-map",
-                        center=dict(lat=np.mean(lats), lon=np.mean(lons)),
-                        zoom=3
-                    ),
-                    height=400,
-                    margin=dict(l=0, r=0, t=0, b=0)
-                )
+                fig = self.cached_figure('storm_map', self.build_storm_map, name)
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
                 # Détails de la tempête
-                current_state = storm['track'][-1]
                 col1, col2, col3, col4 = st.columns(4)
                 
                 with col1:
@@ -315,11 +387,54 @@ class AdvancedWeatherAnalytics:
                     next_update = current_state['datetime'] + timedelta(hours=6)
                     st.metric("Prochaine mise à jour", next_update.strftime("%H:%M"))
     
+    def build_storm_map(self, name):
+        """Carte de trajectoire d'une tempête"""
+        track = self.get_storm_track(name)
+        
+        fig = go.Figure()
+        
+        lats = track['lat'].to_numpy()
+        lons = track['lon'].to_numpy()
+        intensities = track['intensity'].to_numpy()
+        
+        fig.add_trace(go.Scattermapbox(
+            lat=lats,
+            lon=lons,
+            mode='lines+markers',
+            marker=dict(size=8, color=intensities, colorscale='Viridis',
+                       colorbar=dict(title="Intensité (km/h)")),
+            line=dict(width=3, color='red'),
+            hovertemplate="Vitesse: %{marker.color:.1f} km/h<extra></extra>"
+        ))
+        
+        fig.update_layout(
+            mapbox=dict(
+                style="open-street-map",
+                center=dict(lat=np.mean(lats), lon=np.mean(lons)),
+                zoom=3
+            ),
+            height=400,
+            margin=dict(l=0, r=0, t=0, b=0)
+        )
+        return fig
+    
     def create_weather_forecast(self):
         """Prévisions météorologiques"""
         st.markdown("### 📈 Prévisions à 72 heures")
         
-        forecast_data = self.weather_data.tail(72)
+        fig = self.cached_figure('forecast', self.build_forecast_figure, timedelta(hours=72))
+        
+        st.plotly_chart(fig, use_container_width=True)
+    
+    def build_forecast_figure(self, horizon, width=DEFAULT_CHART_WIDTH):
+        """Figure des prévisions sur l'horizon demandé"""
+        forecast_data = self.get_forecast_data(horizon)
+        budget = point_budget(width)
+        # Réduction par série: min-max pour les variables dont les pics comptent
+        temperature = downsample(forecast_data, 'temperature', budget)
+        precipitation = downsample(forecast_data, 'precipitation', budget, method='minmax')
+        wind = downsample(forecast_data, 'wind_speed', budget, method='minmax')
+        pressure = downsample(forecast_data, 'pressure', budget, method='minmax')
         
         fig = make_subplots(rows=2, cols=1, 
                            subplot_titles=('Température et Précipitations', 'Vent et Pression'),
@@ -327,72 +442,86 @@ class AdvancedWeatherAnalytics:
         
         # Température et précipitations
         fig.add_trace(
-            go.Scatter(x=forecast_data['datetime'], y=forecast_data['temperature'],
+            go.Scatter(x=temperature['datetime'], y=temperature['temperature'],
                       name='Température', line=dict(color='red')),
             row=1, col=1
         )
         
         fig.add_trace(
-            go.Bar(x=forecast_data['datetime'], y=forecast_data['precipitation'],
+            go.Bar(x=precipitation['datetime'], y=precipitation['precipitation'],
                    name='Précipitation', marker_color='blue', opacity=0.6),
             row=1, col=1
         )
         
         # Vent et pression
         fig.add_trace(
-            go.Scatter(x=forecast_data['datetime'], y=forecast_data['wind_speed'],
+            go.Scatter(x=wind['datetime'], y=wind['wind_speed'],
                       name='Vitesse vent', line=dict(color='green')),
             row=2, col=1
         )
         
         fig.add_trace(
-            go.Scatter(x=forecast_data['datetime'], y=forecast_data['pressure'],
+            go.Scatter(x=pressure['datetime'], y=pressure['pressure'],
                       name='Pression', line=dict(color='purple'), yaxis='y2'),
             row=2, col=1
         )
         
         fig.update_layout(height=500, showlegend=True)
         fig.update_yaxes(title_text="Pression (hPa)", secondary_y=True, row=2, col=1)
-        
-        st.plotly_chart(fig, use_container_width=True)
+        return fig
     
-    def create_risk_assessment(self):
-        """Évaluation des risques météorologiques"""
-        st.markdown("### ⚠️ Évaluation des Risques")
-        
-        current = self.weather_data.iloc[-1]
+    def create_station_network_overview(self, wind_threshold=60, rain_threshold=10):
+        """Vue d'ensemble du réseau de stations (métriques et risques vectorisés)"""
+        st.markdown("### 🛰️ Réseau de Stations")
         
-        risks = []
+        risks = assess_station_risks(self.stations)
+        alerts = station_alerts(self.stations, wind_threshold, rain_threshold)
+        metrics = station_metrics(self.stations)
         
-        # Évaluation du risque vent
-        if current['wind_speed'] > 60:
-            risks.append(("💨 Vent violent", "Élevé", "Risque de dommages"))
-        elif current['wind_speed'] > 40:
-            risks.append(("💨 Vent fort", "Modéré", "Soyez prudent"))
-        else:
-            risks.append(("💨 Vent", "Faible", "Conditions normales"))
-        
-        # Évaluation du risque précipitations
-        if current['precipitation'] > 10:
-            risks.append(("🌧️ Pluie intense", "Élevé", "Risque d'inondation"))
-        elif current['precipitation'] > 5:
-            risks.append(("🌧️ Forte pluie", "Modéré", "Risque de ruissellement"))
-        else:
-            risks.append(("🌧️ Précipitations", "Faible", "Conditions normales"))
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Stations suivies", len(self.stations))
+        with col2:
+            st.metric("Risque élevé", int((risks == "Élevé").any(axis=1).sum()))
+        with col3:
+            st.metric("En alerte", len(alerts))
+        with col4:
+            st.metric("Rafale max réseau", f"{metrics[('max_24h', 'gust_speed')].max():.1f} km/h")
         
-        # Évaluation du risque température
-        if current['temperature'] > 35:
-            risks.append(("🔥 Canicule", "Élevé", "Risque santé"))
-        elif current['temperature'] < -5:
-            risks.append(("❄️ Froid intense", "Élevé", "Risque santé"))
-        else:
-            risks.append(("🌡️ Température", "Faible", "Conditions normales"))
+        if not alerts.empty:
+            st.dataframe(alerts.join(risks.add_suffix('_risk')).sort_values('wind_speed', ascending=False).head(20),
+                         use_container_width=True)
+    
+    def create_risk_assessment(self, wind_threshold=60, rain_threshold=10):
+        """Évaluation des risques: règles d'alerte évaluées sur tout le réseau, seuils de la sidebar"""
+        st.markdown("### ⚠️ Évaluation des Risques")
         
-        # Afficher les risques
-        for risk_name, level, description in risks:
+        engine = AlertEngine(default_rules(wind_threshold, rain_threshold))
+        # Dernières 24 h et prévisions: les alertes en cours gardent leur heure de début
+        intervals = engine.evaluate(self.stations, since=self.reference_time - timedelta(days=1))
+        active = intervals[(intervals['start'] <= self.reference_time) & (intervals['end'] >= self.reference_time)]
+        upcoming = intervals[(intervals['start'] > self.reference_time)
+                             & (intervals['start'] <= self.reference_time + timedelta(days=1))]
+        
+        for category, (icon, label) in RISK_CATEGORIES.items():
+            current = active[active['category'] == category]
+            if current.empty:
+                level = "Faible"
+                name = f"{icon} {label}"
+                following = upcoming[upcoming['category'] == category]
+                description = ("Conditions normales" if following.empty else
+                               f"{engine.by_name[following.sort_values('start')['rule'].iloc[0]].title} "
+                               f"prévu à {following['start'].min():%Hh}")
+            else:
+                top = current[current['level'] == current['level'].max()]
+                rule = engine.by_name[top['rule'].iloc[0]]
+                level = RISK_LEVELS[rule.level]
+                name = f"{icon} {rule.title}"
+                description = f"{top['station'].nunique()} station(s) jusqu'à {top['end'].max():%d/%m %Hh}"
+            
             col1, col2, col3 = st.columns([1, 1, 2])
             with col1:
-                st.write(risk_name)
+                st.write(name)
             with col2:
                 if level == "Élevé":
                     st.error(level)
@@ -402,6 +531,12 @@ class AdvancedWeatherAnalytics:
                     st.success(level)
             with col3:
                 st.write(description)
+        
+        pending = pd.concat([active, upcoming])
+        if not pending.empty:
+            with st.expander(f"📋 Alertes en cours et prévues ({len(pending)})"):
+                st.dataframe(pending.sort_values(['level', 'start'], ascending=[False, True])
+                             .drop(columns='category').head(50), use_container_width=True, hide_index=True)
 
 def create_ventusky_integration():
     """Crée l'intégration Ventusky"""
@@ -589,25 +724,64 @@ def create_ventusky_integration():
     """
     return ventusky_html
 
+# Périodes d'analyse proposées
+ANALYSIS_PERIODS = {
+    "24 heures": timedelta(hours=24),
+    "48 heures": timedelta(hours=48),
+    "7 jours": timedelta(days=7),
+    "30 jours": timedelta(days=30),
+}
+
+def format_period(period):
+    """Libellé court d'une période (24h, 48h, 7j...)"""
+    hours = int(period / timedelta(hours=1))
+    return f"{hours}h" if hours < 72 else f"{hours // 24}j"
+
+# Intervalles d'actualisation proposés (minutes)
+REFRESH_INTERVALS = [5, 10, 15, 30]
+
+@st.cache_resource(on_release=RefreshWorker.stop)
+def get_refresh_worker():
+    """Worker d'acquisition unique du processus: chaque acquisition publie de nouveaux analytics"""
+    source = create_data_source()
+    # Historique simulé couvrant la plus longue période d'analyse proposée (plus l'heure entamée)
+    days_back = max(ANALYSIS_PERIODS.values()).days + 1
+    worker = RefreshWorker(timed_refresh('simple', lambda: AdvancedWeatherAnalytics(source, days_back=days_back)),
+                           refresh_period(min(REFRESH_INTERVALS) * 60))
+    watch_worker('simple', worker)
+    return worker.start()
+
+def load_analytics():
+    """Derniers analytics publiés, partagés entre toutes les sessions (aucune acquisition au rendu)"""
+    worker = get_refresh_worker()
+    if not worker.ready:
+        # Premier démarrage uniquement: attente de la première acquisition
+        with st.spinner("Chargement des données météo..."):
+            worker.latest()
+    return worker.latest()
+
 def main():
+    # Exposition des métriques d'exploitation (si VENTUSKY_METRICS_PORT est défini)
+    start_metrics_server()
+    reruns.inc(dashboard='simple')
     st.markdown('<h1 class="main-header">🌪️ Ventusky & Analytics Météo Avancées</h1>', 
                 unsafe_allow_html=True)
     
-    # Initialisation des analytics
-    analytics = AdvancedWeatherAnalytics()
-    
     # Sidebar avec contrôles
     st.sidebar.markdown("## 🎛️ Contrôles Analytics")
     
     st.sidebar.markdown("### 📊 Paramètres d'analyse")
+    # Seules les périodes couvertes par les données sont proposées (flux HTTP plus court)
+    span = load_analytics().observed_span()
     analysis_period = st.sidebar.selectbox(
         "Période d'analyse:",
-        ["24 heures", "48 heures", "7 jours", "30 jours"],
+        [name for name, period in ANALYSIS_PERIODS.items() if period <= span] or list(ANALYSIS_PERIODS)[:1],
         index=0
     )
+    period = ANALYSIS_PERIODS[analysis_period]
     
     auto_refresh = st.sidebar.checkbox("🔄 Actualisation automatique", value=True)
-    refresh_interval = st.sidebar.selectbox("Intervalle:", [5, 10, 15, 30], index=1)
+    refresh_interval = st.sidebar.selectbox("Intervalle:", REFRESH_INTERVALS, index=1)
     
     st.sidebar.markdown("### ⚠️ Alertes")
     alert_wind = st.sidebar.slider("Seuil alerte vent (km/h):", 0, 100, 60)
@@ -616,12 +790,31 @@ def main():
     st.sidebar.markdown("---")
     st.sidebar.markdown("## 📈 Métriques Temps Réel")
     
-    # Métriques rapides dans la sidebar
-    current_data = analytics.weather_data.iloc[-1]
-    st.sidebar.metric("🌡️ Température", f"{current_data['temperature']:.1f}°C")
-    st.sidebar.metric("💨 Vent", f"{current_data['wind_speed']:.1f} km/h")
-    st.sidebar.metric("📊 Pression", f"{current_data['pressure']:.1f} hPa")
-    st.sidebar.metric("💧 Humidité", f"{current_data['humidity']:.1f}%")
+    # Actualisation automatique: un minuteur côté navigateur relance uniquement
+    # les fragments dépendant des données, qui relisent le dernier état publié
+    run_every = timedelta(minutes=refresh_interval) if auto_refresh else None
+    
+    with st.sidebar:
+        st.fragment(render_sidebar_metrics, run_every=run_every)()
+    
+    st.fragment(render_tabs, run_every=run_every)(period, alert_wind, alert_rain)
+
+@profiler.panel('sidebar_metrics')
+def render_sidebar_metrics():
+    """Métriques rapides de la sidebar"""
+    # Analytics partagés, actualisés en arrière-plan par le worker d'acquisition
+    analytics = load_analytics()
+    
+    current_data = analytics.get_current_data()
+    st.metric("🌡️ Température", f"{current_data['temperature']:.1f}°C")
+    st.metric("💨 Vent", f"{current_data['wind_speed']:.1f} km/h")
+    st.metric("📊 Pression", f"{current_data['pressure']:.1f} hPa")
+    st.metric("💧 Humidité", f"{current_data['humidity']:.1f}%")
+
+@profiler.panel('tabs')
+def render_tabs(period, alert_wind, alert_rain):
+    """Onglets principaux dépendant des données"""
+    analytics = load_analytics()
     
     # Navigation par onglets principale
     tab1, tab2, tab3, tab4 = st.tabs([
@@ -673,12 +866,15 @@ def main():
         col1, col2 = st.columns([2, 1])
         
         with col1:
-            analytics.create_temperature_analysis()
-            analytics.create_pressure_analysis()
+            analytics.create_temperature_analysis(period)
+            analytics.create_pressure_analysis(period)
         
         with col2:
-            analytics.create_wind_analysis()
-            analytics.create_risk_assessment()
+            analytics.create_wind_analysis(period)
+            analytics.create_risk_assessment(alert_wind, alert_rain)
+        
+        # Réseau de stations
+        analytics.create_station_network_overview(alert_wind, alert_rain)
     
     with tab3:
         st.markdown("### 🌀 Suivi des Systèmes Dépressionnaires")
@@ -686,19 +882,15 @@ def main():
         
         # Statistiques des tempêtes
         st.markdown("#### 📈 Statistiques des Tempêtes Actives")
-        if analytics.storm_tracks:
-            storm_stats = []
-            for storm in analytics.storm_tracks:
-                current = storm['track'][-1]
-                storm_stats.append({
-                    'Nom': storm['name'],
-                    'Catégorie': current['category'],
-                    'Intensité (km/h)': current['intensity'],
-                    'Latitude': current['lat'],
-                    'Longitude': current['lon']
-                })
-            
-            stats_df = pd.DataFrame(storm_stats)
+        if not analytics.storm_tracks.empty:
+            current_states = analytics.get_current_storm_states()
+            stats_df = pd.DataFrame({
+                'Nom': current_states.index,
+                'Catégorie': current_states['category'].to_numpy(),
+                'Intensité (km/h)': current_states['intensity'].to_numpy(),
+                'Latitude': current_states['lat'].to_numpy(),
+                'Longitude': current_states['lon'].to_numpy()
+            })
             st.dataframe(stats_df, use_container_width=True)
     
     with tab4:
@@ -708,7 +900,7 @@ def main():
         # Résumé des prévisions
         st.markdown("#### 📋 Résumé des Prévisions")
         
-        forecast_summary = analytics.weather_data.tail(24)
+        forecast_summary = analytics.get_forecast_data(timedelta(hours=24))
         
         col1, col2, col3, col4 = st.columns(4)
         
@@ -727,11 +919,6 @@ def main():
         with col4:
             avg_wind = forecast_summary['wind_speed'].mean()
             st.metric("Vent moyen", f"{avg_wind:.1f} km/h")
-    
-    # Actualisation automatique
-    if auto_refresh:
-        time.sleep(refresh_interval * 60)
-        st.rerun()
 
 if __name__ == "__main__":
     main()
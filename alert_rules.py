@@ -0,0 +1,265 @@
+# alert_rules.py
+"""Moteur d'alertes à règles déclaratives, évaluées sur tout le réseau.
+
+Une règle compare un signal (une variable, ou sa variation sur `rate_hours`
+heures, éventuellement lissée par une moyenne glissante sur `window_hours`
+heures) à un seuil de déclenchement, au-dessus ou en dessous. Avec un seuil
+de levée (`clear`) distinct, l'alerte reste active tant que le signal n'est pas
+revenu au-delà de ce seuil (hystérésis). Une alerte n'est retenue que si elle
+dure au moins `duration` heures.
+
+Toutes les règles portant sur le même signal sont évaluées ensemble sur le bloc
+station × temps complet: une comparaison par lot de règles, l'hystérésis par
+report du dernier événement (`np.maximum.accumulate`), puis les intervalles
+sont extraits des fronts montants / descendants. Le coût ne dépend pas d'une
+boucle sur les stations ni sur les pas de temps.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from stations import RISK_LEVELS, RISK_THRESHOLDS, HEAT_THRESHOLD, COLD_THRESHOLD
+
+# Cellules règle × station × temps évaluées par lot (borne la mémoire temporaire)
+MAX_BATCH_CELLS = 1 << 23
+
+# Libellés des alertes publiées, par niveau (1 modéré, 2 élevé)
+ALERT_SEVERITIES = {1: 'Modérée', 2: 'Élevée'}
+ALERT_TYPES = {1: 'VIGILANCE_JAUNE', 2: 'VIGILANCE_ORANGE'}
+
+
+class AlertRule:
+    """Règle d'alerte: seuil, sens, lissage et variation optionnels, durée minimale et hystérésis"""
+
+    def __init__(self, name, variable, threshold, direction='above', clear=None, duration=1,
+                 rate_hours=None, window_hours=None, level=1, category=None, title=None, unit='', impact='', actions=''):
+        if direction not in ('above', 'below'):
+            raise ValueError(f"Règle {name}: sens '{direction}' inconnu (above / below)")
+        if level not in ALERT_SEVERITIES:
+            raise ValueError(f"Règle {name}: niveau {level} hors de {sorted(ALERT_SEVERITIES)}")
+        clear = threshold if clear is None else clear
+        if (clear > threshold) if direction == 'above' else (clear < threshold):
+            raise ValueError(f"Règle {name}: le seuil de levée doit être en deçà du seuil de déclenchement")
+        if duration < 1 or any(hours is not None and hours < 1 for hours in (rate_hours, window_hours)):
+            raise ValueError(f"Règle {name}: durée, pas de variation et lissage d'au moins une heure")
+        self.name = name
+        self.variable = variable
+        self.threshold = float(threshold)
+        self.direction = direction
+        self.clear = float(clear)
+        self.duration = int(duration)
+        self.rate_hours = rate_hours
+        self.window_hours = window_hours
+        self.level = level
+        self.category = category or variable
+        self.title = title or name
+        self.unit = unit
+        self.impact = impact
+        self.actions = actions
+
+    @property
+    def signal(self):
+        """Clé du signal évalué: les règles de même clé sont traitées en un lot"""
+        return self.variable, self.rate_hours, self.window_hours, self.direction
+
+
+def trailing_mean(values, hours):
+    """Moyenne sur les `hours` derniers pas; NaN si la fenêtre est incomplète ou lacunaire"""
+    missing = np.isnan(values)
+    totals = np.zeros((values.shape[0], values.shape[1] + 1))
+    gaps = np.zeros(totals.shape, dtype=np.int32)
+    np.cumsum(np.where(missing, 0.0, values), axis=1, out=totals[:, 1:])
+    np.cumsum(missing, axis=1, out=gaps[:, 1:])
+    mean = np.full(values.shape, np.nan, dtype=np.float32)
+    complete = gaps[:, hours:] == gaps[:, :-hours]
+    mean[:, hours - 1:] = np.where(complete, (totals[:, hours:] - totals[:, :-hours]) / hours, np.nan)
+    return mean
+
+
+def rule_signal(array, variable, rate_hours, window_hours, direction):
+    """Signal (stations, temps) orienté pour que l'alerte corresponde toujours à `> seuil`"""
+    values = array.variable(variable)
+    if window_hours is not None:
+        values = trailing_mean(values, window_hours)
+    if rate_hours is not None:
+        # Variation sur `rate_hours` pas horaires; indéfinie en début de série
+        change = np.full(values.shape, np.nan, dtype=np.float32)
+        change[:, rate_hours:] = values[:, rate_hours:] - values[:, :-rate_hours]
+        values = change
+    return -values if direction == 'below' else values
+
+
+def active_rows(signal, on, off):
+    """Lignes (règle, station) déclenchées au moins une fois et leurs états actifs dans le temps.
+
+    Sans hystérésis (`on` == `off`), l'état est le déclenchement; sinon l'alerte est
+    active si son dernier déclenchement suit sa dernière levée (NaN lève l'alerte).
+    """
+    # Une ligne ne peut se déclencher que si le maximum de la station dépasse le seuil
+    rules, stations = np.nonzero(np.fmax.reduce(signal, axis=1)[None, :] > on[:, None])
+    rows = signal[stations]
+    states = rows > on[rules, None]
+    if not np.array_equal(on, off):
+        steps = np.arange(signal.shape[1], dtype=np.int16 if signal.shape[1] < 2 ** 15 else np.int32)
+        last_on = np.where(states, steps, -1).astype(steps.dtype, copy=False)
+        last_off = np.where(rows > off[rules, None], -1, steps).astype(steps.dtype, copy=False)
+        np.maximum.accumulate(last_on, axis=-1, out=last_on)
+        np.maximum.accumulate(last_off, axis=-1, out=last_off)
+        states = last_on > last_off
+    return rules, stations, states
+
+
+def state_intervals(states):
+    """(ligne, début, fin exclusive) de chaque plage active d'un tableau (lignes, temps)"""
+    padded = np.zeros((states.shape[0], states.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = states
+    edges = padded[:, 1:] - padded[:, :-1]
+    # Fronts montants et descendants alternent dans chaque ligne: ils s'apparient dans l'ordre
+    flat = np.flatnonzero(edges)
+    rising = edges.ravel()[flat] == 1
+    rows, starts = np.divmod(flat[rising], edges.shape[1])
+    return rows, starts, flat[~rising] % edges.shape[1]
+
+
+def interval_peaks(signal, stations, starts, ends):
+    """Extremum du signal sur chaque intervalle (réduction segmentée, NaN ignorés)"""
+    if not len(starts):
+        return np.empty(0, dtype=np.float32)
+    n_times = signal.shape[1]
+    flat = np.append(signal.ravel(), np.float32(np.nan))
+    bounds = np.empty(2 * len(starts), dtype=np.intp)
+    bounds[0::2] = stations * n_times + starts
+    bounds[1::2] = stations * n_times + ends
+    return np.fmax.reduceat(flat, bounds)[0::2]
+
+
+class AlertEngine:
+    """Évalue un ensemble de règles sur un bloc station × temps et produit des intervalles d'alerte"""
+
+    COLUMNS = ['rule', 'category', 'level', 'station', 'start', 'end', 'hours', 'peak']
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        names = [rule.name for rule in self.rules]
+        if len(set(names)) != len(names):
+            raise ValueError("Noms de règles en double")
+        self.by_name = dict(zip(names, self.rules))
+        # Règles regroupées par signal: chaque signal n'est calculé qu'une fois
+        self.groups = {}
+        for index, rule in enumerate(self.rules):
+            self.groups.setdefault(rule.signal, []).append(index)
+
+    def evaluate(self, array, since=None):
+        """Intervalles d'alerte de toutes les règles sur le bloc (une ligne par intervalle).
+
+        `start` et `end` sont le premier et le dernier pas de temps actifs, `hours`
+        la durée et `peak` la valeur extrême atteinte par le signal de la règle.
+        Avec `since`, seuls les pas de temps postérieurs sont évalués (vue, sans copie).
+        """
+        if since is not None:
+            array = array.evict_before(since)
+        n_stations, n_times = len(array.stations), len(array.times)
+        if not n_stations or not n_times:
+            return pd.DataFrame(columns=self.COLUMNS)
+        batch = max(1, MAX_BATCH_CELLS // max(n_stations * n_times, 1))
+        parts = []
+        for (variable, rate_hours, window_hours, direction), indices in self.groups.items():
+            if variable not in array.variables:
+                continue
+            signal = rule_signal(array, variable, rate_hours, window_hours, direction)
+            sign = -1 if direction == 'below' else 1
+            for first in range(0, len(indices), batch):
+                chunk = np.array(indices[first:first + batch])
+                rules = [self.rules[i] for i in chunk]
+                on = np.array([sign * rule.threshold for rule in rules], dtype=np.float32)
+                off = np.array([sign * rule.clear for rule in rules], dtype=np.float32)
+                rule_rows, station_rows, states = active_rows(signal, on, off)
+                rows, starts, ends = state_intervals(states)
+                local, stations = rule_rows[rows], station_rows[rows]
+                durations = np.array([rule.duration for rule in rules])
+                keep = ends - starts >= durations[local]
+                local, stations, starts, ends = local[keep], stations[keep], starts[keep], ends[keep]
+                parts.append((chunk[local], stations, starts, ends,
+                              sign * interval_peaks(signal, stations, starts, ends)))
+
+        if not parts:
+            return pd.DataFrame(columns=self.COLUMNS)
+        rule_index, stations, starts, ends, peaks = (np.concatenate(column) for column in zip(*parts))
+        categories = pd.unique(pd.Series([rule.category for rule in self.rules]))
+        category_codes = pd.Index(categories).get_indexer([rule.category for rule in self.rules])
+        return pd.DataFrame({
+            'rule': pd.Categorical.from_codes(rule_index, categories=[rule.name for rule in self.rules]),
+            'category': pd.Categorical.from_codes(category_codes[rule_index], categories=categories),
+            'level': pd.Categorical.from_codes(np.array([rule.level for rule in self.rules])[rule_index],
+                                               categories=RISK_LEVELS, ordered=True),
+            'station': array.stations[stations],
+            'start': array.times[starts],
+            'end': array.times[ends - 1],
+            'hours': (ends - starts).astype(np.int32),
+            'peak': peaks.astype(np.float32),
+        }, columns=self.COLUMNS)
+
+    def bulletins(self, intervals, when=None, horizon=timedelta(hours=24)):
+        """Alertes publiées: par catégorie, la règle de plus haut niveau active entre `when` et l'horizon"""
+        when = pd.Timestamp(datetime.now() if when is None else when)
+        upcoming = intervals[(intervals['end'] >= when.floor('h')) & (intervals['start'] <= when + horizon)]
+        alerts = []
+        for _, group in upcoming.groupby('category', sort=False, observed=True):
+            rule = self.by_name[group.loc[group['level'] == group['level'].max(), 'rule'].iloc[0]]
+            top = group[group['rule'] == rule.name]
+            stations = top['station'].unique()
+            peak = top['peak'].max() if rule.direction == 'above' else top['peak'].min()
+            alerts.append((rule.level, {
+                'type': ALERT_TYPES[rule.level],
+                'title': rule.title,
+                'region': f"{len(stations)} station(s): " + ", ".join(map(str, stations[:3]))
+                          + (" …" if len(stations) > 3 else ""),
+                'severity': ALERT_SEVERITIES[rule.level],
+                'start_time': max(top['start'].min(), when).to_pydatetime(),
+                'end_time': top['end'].max().to_pydatetime(),
+                'description': f"Valeur extrême attendue: {peak:.1f} {rule.unit}".rstrip(),
+                'impact': rule.impact,
+                'actions': rule.actions,
+            }))
+        # Niveau le plus élevé d'abord, puis par début
+        alerts.sort(key=lambda item: (-item[0], item[1]['start_time']))
+        return [alert for _, alert in alerts]
+
+
+def default_rules(wind_threshold=RISK_THRESHOLDS['wind_speed'][1],
+                  rain_threshold=RISK_THRESHOLDS['precipitation'][1]):
+    """Règles du réseau; les seuils élevés vent / pluie sont ceux de la sidebar.
+
+    Le seuil modéré garde la proportion de RISK_THRESHOLDS et chaque alerte n'est
+    levée qu'à 80 % de son seuil, pour éviter les clignotements autour du seuil.
+    Chaleur, froid et chute de pression portent sur des moyennes glissantes: un
+    pic isolé ou un relevé bruité ne suffit pas (taux mesurés par
+    benchmarks/bench_alert_rates.py).
+    """
+    rules = []
+    for variable, category, threshold, unit, titles, impact, actions in (
+            ('wind_speed', 'wind', wind_threshold, 'km/h', ("Vent fort", "Vent violent"),
+             "Risque de dommages", "Éviter les zones exposées"),
+            ('precipitation', 'rain', rain_threshold, 'mm/h', ("Forte pluie", "Pluie intense"),
+             "Risque de ruissellement et d'inondation", "Surveillance des cours d'eau")):
+        moderate, high = RISK_THRESHOLDS[variable]
+        for level, value in ((1, threshold * moderate / high), (2, threshold)):
+            rules.append(AlertRule(f"{category}_{level}", variable, value, clear=0.8 * value, level=level,
+                                   category=category, title=titles[level - 1], unit=unit,
+                                   impact=impact, actions=actions))
+    rules += [
+        # Épisode: moyenne sur 12 h au-delà du seuil, tenue au moins 12 h (pas le seul pic de l'après-midi)
+        AlertRule('heat', 'temperature', HEAT_THRESHOLD, clear=HEAT_THRESHOLD - 1, window_hours=12,
+                  duration=12, level=2, category='temperature', title="Canicule", unit='°C',
+                  impact="Risque santé", actions="S'hydrater, limiter les efforts"),
+        AlertRule('cold', 'temperature', COLD_THRESHOLD, direction='below', clear=COLD_THRESHOLD + 1,
+                  window_hours=12, duration=12, level=2, category='temperature', title="Froid intense",
+                  unit='°C', impact="Risque santé", actions="Protéger les personnes vulnérables"),
+        # Variation sur 3 h de la pression moyennée sur 6 h: le bruit horaire des relevés est filtré
+        AlertRule('pressure_drop', 'pressure', -10, direction='below', clear=-8, rate_hours=3,
+                  window_hours=6, duration=3, category='pressure', title="Chute rapide de pression",
+                  unit='hPa/3h', impact="Détérioration météo probable",
+                  actions="Suivre l'évolution des prévisions"),
+    ]
+    return rules
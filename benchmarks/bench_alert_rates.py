@@ -0,0 +1,80 @@
+# bench_alert_rates.py
+"""Fréquence de déclenchement des règles par défaut sur le réseau simulé de l'application.
+
+Pour chaque règle de `default_rules()`: alertes par station et par semaine,
+part des heures-station en alerte, et part des heures où un bandeau serait
+publié (une alerte de la règle active dans les 24 h qui suivent, sur l'ensemble
+du réseau). Moyenne et maximum sur plusieurs tirages du simulateur.
+
+Les règles à seuils fixes (hors vent / pluie, réglés depuis la sidebar) ne
+doivent produire un bandeau qu'une minorité du temps: le script échoue si
+l'une d'elles dépasse en moyenne `--max-bulletin` % des heures.
+
+    python benchmarks/bench_alert_rates.py --stations 50 --days 14 --seeds 5
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from alert_rules import AlertEngine, default_rules  # noqa: E402
+from stations import default_network_window, default_station_ids, generate_station_array  # noqa: E402
+
+# Règles dont le seuil est choisi par l'utilisateur: mesurées, non contrôlées
+SIDEBAR_CATEGORIES = {'wind', 'rain'}
+HORIZON_HOURS = 24
+
+
+def firing_rates(engine, array):
+    """{règle: (alertes / station / semaine, % heures-station actives, % heures avec bandeau)}"""
+    intervals = engine.evaluate(array)
+    n_stations, n_times = len(array.stations), len(array.times)
+    weeks = n_times / (24 * 7)
+    rates = {}
+    for rule in engine.rules:
+        rows = intervals[intervals['rule'] == rule.name]
+        # Bandeau à l'heure h si un intervalle recoupe [h, h + horizon] (cf. AlertEngine.bulletins)
+        starts = array.times.get_indexer(rows['start'])
+        ends = array.times.get_indexer(rows['end'])
+        edges = np.zeros(n_times + 1, dtype=np.int32)
+        np.add.at(edges, np.maximum(starts - HORIZON_HOURS, 0), 1)
+        np.add.at(edges, ends + 1, -1)
+        published = np.cumsum(edges[:-1]) > 0
+        rates[rule.name] = (len(rows) / n_stations / weeks,
+                            100 * rows['hours'].sum() / (n_stations * n_times),
+                            100 * published.mean())
+    return rates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stations', type=int, default=50)
+    parser.add_argument('--days', type=int, default=14, help="historique simulé (jours, + 7 j de prévision)")
+    parser.add_argument('--seeds', type=int, default=5, help="nombre de tirages du simulateur")
+    parser.add_argument('--max-bulletin', type=float, default=10.0,
+                        help="part moyenne maximale (%%) des heures avec bandeau, règles à seuil fixe")
+    args = parser.parse_args()
+
+    engine = AlertEngine(default_rules())
+    start, end = default_network_window(args.days, 7)
+    stations = default_station_ids(args.stations)
+    runs = [firing_rates(engine, generate_station_array(stations, start, end, seed=seed))
+            for seed in range(args.seeds)]
+
+    print(f"{'règle':>15} {'alertes/st/sem':>15} {'h-station %':>12} {'bandeau %':>10} {'max %':>7}")
+    failures = []
+    for rule in engine.rules:
+        per_run = np.array([run[rule.name] for run in runs])
+        events, hours, published = per_run.mean(axis=0)
+        print(f"{rule.name:>15} {events:15.3f} {hours:12.2f} {published:10.1f} {per_run[:, 2].max():7.1f}")
+        if rule.category not in SIDEBAR_CATEGORIES and published > args.max_bulletin:
+            failures.append(f"{rule.name} ({published:.1f} %)")
+    if failures:
+        sys.exit(f"Bandeau au-delà de {args.max_bulletin} % du temps: " + ", ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
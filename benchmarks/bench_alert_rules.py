@@ -0,0 +1,76 @@
+# bench_alert_rules.py
+"""Benchmark du moteur de règles d'alerte sur un réseau simulé.
+
+Génère `--rules` règles réparties sur les variables du réseau (seuils tirés
+entre les quantiles 90 et 99,9 de chaque variable, moitié avec hystérésis,
+durées de 1 à 3 h, un quart en variation sur 3 h) et mesure l'évaluation
+complète pour chaque combinaison de nombre de règles et de stations.
+
+    python benchmarks/bench_alert_rules.py --rules 10,100,500 --stations 50,500 --days 14
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from alert_rules import AlertEngine, AlertRule  # noqa: E402
+from stations import default_network_window, default_station_ids, generate_station_array  # noqa: E402
+
+VARIABLES = ['wind_speed', 'gust_speed', 'precipitation', 'temperature', 'pressure', 'humidity']
+
+
+def random_rules(array, n_rules, seed=0):
+    rng = np.random.default_rng(seed)
+    rules = []
+    for i in range(n_rules):
+        variable = VARIABLES[i % len(VARIABLES)]
+        rate_hours = 3 if rng.random() < 0.25 else None
+        values = array.variable(variable)
+        if rate_hours:
+            values = values[:, rate_hours:] - values[:, :-rate_hours]
+        threshold = float(np.quantile(values, rng.uniform(0.9, 0.999)))
+        clear = threshold - abs(threshold) * 0.1 if rng.random() < 0.5 else None
+        rules.append(AlertRule(f"r{i:04d}", variable, threshold, clear=clear, rate_hours=rate_hours,
+                               duration=int(rng.integers(1, 4))))
+    return rules
+
+
+def best_of(repeat, function):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def parse_ints(text):
+    return [int(value) for value in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rules', type=parse_ints, default=[10, 100, 500])
+    parser.add_argument('--stations', type=parse_ints, default=[50, 500])
+    parser.add_argument('--days', type=int, default=14, help="historique simulé (jours, + 3 j de prévision)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    start, end = default_network_window(args.days, 3)
+    print(f"{'règles':>7} {'stations':>9} {'cellules':>12} {'durée':>10} {'intervalles':>12} {'Mcell/s':>8}")
+    for n_stations in args.stations:
+        array = generate_station_array(default_station_ids(n_stations), start, end, seed=0)
+        for n_rules in args.rules:
+            engine = AlertEngine(random_rules(array, n_rules))
+            seconds, intervals = best_of(args.repeat, lambda: engine.evaluate(array))
+            cells = n_rules * n_stations * len(array.times)
+            print(f"{n_rules:>7} {n_stations:>9} {cells:>12} {seconds * 1000:8.1f}ms {len(intervals):>12}"
+                  f" {cells / seconds / 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
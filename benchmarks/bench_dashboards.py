@@ -0,0 +1,224 @@
+# bench_dashboards.py
+"""Benchmark hors navigateur des deux dashboards (sans serveur Streamlit).
+
+Mesure, pour chaque combinaison de longueur d'historique, de nombre de stations
+et de nombre de tempêtes: la génération des données, chaque panneau `create_*`
+(cache de figures vide puis chaud) et la sérialisation des graphiques envoyés
+au navigateur (durée et volume). Les appels Streamlit s'exécutent en mode nu
+(sans session, ils n'envoient rien); `st.plotly_chart` est remplacé par un
+enregistreur qui sérialise la figure comme le ferait Streamlit.
+
+    python benchmarks/bench_dashboards.py --days 7,30 --stations 50,500 --storms 3,30
+    python benchmarks/bench_dashboards.py --baseline benchmarks/results/bench-20250101-120000.json
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import plotly  # noqa: E402
+import streamlit as st  # noqa: E402
+from streamlit.logger import set_log_level  # noqa: E402
+
+import Dashboard  # noqa: E402
+import DashboardPro  # noqa: E402
+from figure_cache import figure_cache, next_data_version  # noqa: E402
+
+# Sans session, chaque appel Streamlit journalise un avertissement (niveau fixé
+# après l'import des dashboards, dont la configuration le réinitialise)
+set_log_level('error')
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+SIMPLE_PANELS = ['create_weather_metrics', 'create_temperature_analysis', 'create_wind_analysis',
+                 'create_pressure_analysis', 'create_storm_tracking', 'create_weather_forecast',
+                 'create_station_network_overview', 'create_risk_assessment']
+PRO_PANELS = ['create_advanced_metrics_dashboard', 'create_station_network_overview',
+              'create_ai_weather_analysis', 'create_advanced_storm_analytics',
+              'create_weather_impact_analysis', 'create_climate_analytics']
+
+
+class ChartRecorder:
+    """Remplace st.plotly_chart: sérialise la figure et relève durée et volume"""
+
+    def __init__(self):
+        self.charts = 0
+        self.payload_bytes = 0
+        self.serialize_seconds = 0.0
+
+    def __call__(self, figure, *args, **kwargs):
+        start = time.perf_counter()
+        payload = figure.to_json()
+        self.serialize_seconds += time.perf_counter() - start
+        self.charts += 1
+        self.payload_bytes += len(payload)
+
+
+@contextlib.contextmanager
+def recording_charts():
+    recorder = ChartRecorder()
+    original = st.plotly_chart
+    st.plotly_chart = recorder
+    try:
+        yield recorder
+    finally:
+        st.plotly_chart = original
+
+
+def best_of(repeat, function):
+    """Meilleur temps (s) de `repeat` exécutions et dernier résultat"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def bench_panel(analytics, name, repeat):
+    """Panneau avec cache de figures vide (premier rendu) puis chaud (rendus suivants)"""
+    panel = getattr(analytics, name)
+    figure_cache.clear()
+    with recording_charts() as recorder:
+        start = time.perf_counter()
+        panel()
+        cold = time.perf_counter() - start
+    warm, _ = best_of(repeat, panel)
+    return {
+        'cold_ms': cold * 1000,
+        'warm_ms': warm * 1000,
+        'charts': recorder.charts,
+        'payload_bytes': recorder.payload_bytes,
+        'serialize_ms': recorder.serialize_seconds * 1000,
+    }
+
+
+def storm_names(n_storms):
+    """Noms répartis sur les bassins (le bassin est déduit du nom)"""
+    basins = itertools.cycle(DashboardPro.STORM_BASINS)
+    return tuple(f"{next(basins)}-{i:02d}" for i in range(n_storms))
+
+
+def build_simple(days, stations, storms):
+    analytics = Dashboard.AdvancedWeatherAnalytics(n_stations=stations, days_back=days)
+    analytics.storm_tracks = analytics.generate_storm_data(n_storms=storms)
+    analytics.data_version = next_data_version()
+    return analytics
+
+
+def build_pro(days, stations, storms):
+    analytics = DashboardPro.EnhancedWeatherAnalytics(n_stations=stations, history_days=days)
+    tracks, table = analytics.generate_enhanced_storm_data(storm_names(storms))
+    analytics.publish(storm_tracks=tracks, storms=table, data_version=next_data_version())
+    return analytics
+
+
+DASHBOARDS = {
+    'simple': (build_simple, SIMPLE_PANELS),
+    'pro': (build_pro, PRO_PANELS),
+}
+
+
+def run_case(dashboard, days, stations, storms, repeat):
+    build, panels = DASHBOARDS[dashboard]
+    np.random.seed(0)
+    generation, analytics = best_of(1, lambda: build(days, stations, storms))
+    result = {
+        'dashboard': dashboard,
+        'case': {'days': days, 'stations': stations, 'storms': storms},
+        'rows': len(analytics.weather_data),
+        'generation_ms': generation * 1000,
+        'panels': {name: bench_panel(analytics, name, repeat) for name in panels},
+    }
+    if dashboard == 'pro':
+        # Actualisation incrémentale (aucune heure nouvelle dans le cas simulé courant)
+        result['refresh_ms'] = best_of(repeat, analytics.refresh)[0] * 1000
+    return result
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(RESULTS_DIR), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result, baseline=None):
+    case = result['case']
+    print(f"\n[{result['dashboard']}] {case['days']} j, {case['stations']} stations, {case['storms']} tempêtes"
+          f" - {result['rows']} lignes, génération {result['generation_ms']:.1f} ms")
+    print(f"{'panneau':<36} {'froid':>9} {'chaud':>9} {'graph.':>6} {'sérial.':>9} {'volume':>10}")
+    for name, panel in result['panels'].items():
+        line = (f"{name:<36} {panel['cold_ms']:8.1f}ms {panel['warm_ms']:8.1f}ms {panel['charts']:>6}"
+                f" {panel['serialize_ms']:8.1f}ms {panel['payload_bytes'] / 1024:8.1f}Ko")
+        reference = (baseline or {}).get(name)
+        if reference:
+            line += f"  ({panel['warm_ms'] / max(reference['warm_ms'], 1e-6):.2f}× réf.)"
+        print(line)
+
+
+def load_baseline(path):
+    """Panneaux de la référence, indexés par (dashboard, cas)"""
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    return {(r['dashboard'], tuple(sorted(r['case'].items()))): r['panels'] for r in report['results']}
+
+
+def parse_ints(text):
+    return [int(value) for value in text.split(',')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dashboards', default='simple,pro')
+    parser.add_argument('--days', type=parse_ints, default=[7, 30], help="longueur d'historique (jours)")
+    parser.add_argument('--stations', type=parse_ints, default=[50, 500])
+    parser.add_argument('--storms', type=parse_ints, default=[3, 30])
+    parser.add_argument('--repeat', type=int, default=3, help="rendus chauds mesurés par panneau")
+    parser.add_argument('--output', help="fichier JSON (défaut: benchmarks/results/bench-<date>.json)")
+    parser.add_argument('--baseline', help="résultats JSON d'une exécution précédente à comparer")
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else {}
+    # Échauffement: les imports différés (plotly.express...) ne doivent pas peser sur le premier cas
+    for dashboard in args.dashboards.split(','):
+        run_case(dashboard, min(args.days), min(args.stations), min(args.storms), 1)
+    results = []
+    for dashboard in args.dashboards.split(','):
+        for days, stations, storms in itertools.product(args.days, args.stations, args.storms):
+            result = run_case(dashboard, days, stations, storms, args.repeat)
+            results.append(result)
+            print_result(result, baseline.get((dashboard, tuple(sorted(result['case'].items())))))
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'versions': {'numpy': np.__version__, 'pandas': pd.__version__,
+                         'plotly': plotly.__version__, 'streamlit': st.__version__},
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# bench_schema.py
+"""Empreinte mémoire du schéma compact face au stockage float64 d'origine.
+
+Le gain des libellés (station en object -> catégorie) et celui des variables
+numériques (float64 -> float32 / int16) sont mesurés séparément: la référence
+numérique stocke déjà la station en catégorie.
+
+    python benchmarks/bench_schema.py --stations 100 --days 365
+"""
+import argparse
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schema import apply_schema, memory_report  # noqa: E402
+from stations import default_station_ids, generate_station_array  # noqa: E402
+
+
+def long_frame(n_stations, days):
+    """Réseau simulé au format long (station, datetime, variables), en float64 et libellés str"""
+    end = datetime.now().replace(minute=0, second=0, microsecond=0)
+    array = generate_station_array(default_station_ids(n_stations), end - timedelta(days=days), end, seed=0)
+    frame = array.to_frame().astype('float64').reset_index()
+    frame['station'] = frame['station'].astype(object)
+    return frame
+
+
+def megabytes(nbytes):
+    return f"{nbytes / 2**20:,.1f} Mo"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stations', type=int, default=100)
+    parser.add_argument('--days', type=int, default=365)
+    args = parser.parse_args()
+
+    original = long_frame(args.stations, args.days)
+    # Référence équitable: seule la station est déjà compacte
+    reference = original.assign(station=original['station'].astype('category'))
+    compact = apply_schema(original)
+    report = memory_report(compact, reference)
+    print(report.to_string(float_format=lambda v: f"{v:,.2f}"))
+
+    labels = original['station'].memory_usage(deep=True, index=False)
+    categories = reference['station'].memory_usage(deep=True, index=False)
+    total = report.loc['Total']
+    print(f"\n{len(original):,} lignes")
+    print(f"libellés (station object -> catégorie): {megabytes(labels)} -> {megabytes(categories)} "
+          f"(x{labels / categories:.1f})")
+    print(f"variables (float64 -> schéma compact): {megabytes(total['reference_bytes'])} -> "
+          f"{megabytes(total['bytes'])} (x{total['ratio']:.2f})")
@@ -0,0 +1,60 @@
+# bench_stations.py
+"""Benchmark du modèle multi-stations: 1000 stations × 21 jours horaires.
+
+    python benchmarks/bench_stations.py --stations 1000 --days-back 14 --days-forward 7
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stations import (assess_station_risks, default_network_window, default_station_ids,  # noqa: E402
+                      generate_station_array, station_alerts, station_metrics)
+
+
+def timed(label, func, *args, repeat=5):
+    """Exécute `func` plusieurs fois et affiche le meilleur temps"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:10.2f} ms")
+    return result
+
+
+def per_station_loop(array):
+    """Référence: évaluation scalaire station par station (ancienne approche)"""
+    idx = array.index_at(array.times[-1])
+    wind = array.variable('wind_speed')
+    rain = array.variable('precipitation')
+    levels = []
+    for s in range(len(array)):
+        w, r = wind[s, idx], rain[s, idx]
+        levels.append(("Élevé" if w > 60 else "Modéré" if w > 40 else "Faible",
+                       "Élevé" if r > 10 else "Modéré" if r > 5 else "Faible"))
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stations', type=int, default=1000)
+    parser.add_argument('--days-back', type=int, default=14)
+    parser.add_argument('--days-forward', type=int, default=7)
+    args = parser.parse_args()
+
+    start, end = default_network_window(args.days_back, args.days_forward)
+    stations = default_station_ids(args.stations)
+    array = timed("génération du réseau", generate_station_array, stations, start, end, repeat=1)
+    print(f"forme {array.values.shape}, {array.nbytes / 1e6:.1f} Mo")
+
+    timed("station_metrics (vectorisé)", station_metrics, array)
+    timed("assess_station_risks (vectorisé)", assess_station_risks, array)
+    timed("station_alerts (vectorisé)", station_alerts, array, 60, 10)
+    timed("risques vent/pluie (boucle par station)", per_station_loop, array)
+
+
+if __name__ == "__main__":
+    main()
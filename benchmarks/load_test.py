@@ -0,0 +1,347 @@
+# load_test.py
+"""Test de charge: N sessions simultanées contre un dashboard servi en local.
+
+Chaque session simulée parle le protocole websocket de Streamlit comme un
+navigateur: chargement initial, actualisations automatiques des fragments
+(accélérées), changements d'onglet et de widgets (sélecteur de tempête,
+période, seuils). Le serveur est démarré par le script (ou désigné par --url
+et --pid); sa mémoire et son CPU sont relevés dans /proc (Linux).
+
+    python benchmarks/load_test.py --app DashboardPro.py --sessions 1,10,25,50 --duration 30
+    python benchmarks/load_test.py --url http://127.0.0.1:8501 --pid 12345 --sessions 20
+
+Rapport par palier: latence des exécutions par type d'action (p50 / p90 / p99),
+mémoire du serveur par session, CPU moyen et maximal (100 % = un cœur saturé).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+
+try:
+    from websockets.asyncio.client import connect
+except ImportError:  # websockets est installé avec le serveur de Streamlit
+    connect = None
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.Slider_pb2 import Slider
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+FINISHED = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY}
+
+
+class ServerProcess:
+    """Serveur Streamlit lancé en sous-processus (sans navigateur)"""
+
+    def __init__(self, app, port, env=None):
+        self.url = f"http://127.0.0.1:{port}"
+        command = [sys.executable, '-m', 'streamlit', 'run', os.path.join(ROOT, app),
+                   '--server.headless', 'true', '--server.port', str(port),
+                   '--browser.gatherUsageStats', 'false']
+        self.process = subprocess.Popen(command, cwd=ROOT, env={**os.environ, **(env or {})},
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.pid = self.process.pid
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Le serveur s'est arrêté (code {self.process.returncode})")
+            try:
+                with urllib.request.urlopen(f"{self.url}/_stcore/health", timeout=1) as response:
+                    if response.status == 200:
+                        return
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError("Le serveur Streamlit ne répond pas")
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+class ProcessMonitor:
+    """Échantillonne CPU (%) et mémoire résidente (octets) d'un processus via /proc"""
+
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.ticks = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.cpu = []
+        self.rss = []
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            # Le nom du processus (2e champ) peut contenir des espaces
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self.ticks
+
+    def rss_bytes(self):
+        with open(f"/proc/{self.pid}/statm") as f:
+            return int(f.read().split()[1]) * self.page_size
+
+    def reset(self):
+        self.cpu, self.rss = [], []
+
+    async def run(self, stop):
+        previous, previous_time = self.cpu_seconds(), time.monotonic()
+        while not stop.is_set():
+            await asyncio.sleep(self.interval)
+            current, now = self.cpu_seconds(), time.monotonic()
+            self.cpu.append(100 * (current - previous) / (now - previous_time))
+            self.rss.append(self.rss_bytes())
+            previous, previous_time = current, now
+
+
+class SimulatedSession:
+    """Un spectateur: chargement, puis actualisations automatiques et interactions"""
+
+    # Part des actions qui rechargent toute la page
+    RELOAD_RATE = 0.1
+
+    def __init__(self, url, rng, think_time, refresh_every, timeout):
+        self.url = url.replace('http', 'ws', 1) + "/_stcore/stream"
+        self.rng = rng
+        self.think_time = think_time
+        self.refresh_every = refresh_every
+        self.timeout = timeout
+        # Widgets vus: id -> (type, libellé, options, fragment); valeurs envoyées: id -> WidgetState
+        self.widgets = {}
+        self.states = {}
+        self.fragments = set()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    async def run(self, deadline):
+        try:
+            async with connect(self.url, subprotocols=['streamlit'], max_size=None) as ws:
+                self.ws = ws
+                await self.rerun('initial')
+                next_refresh = time.monotonic() + self.refresh_every
+                while time.monotonic() < deadline:
+                    if time.monotonic() >= next_refresh and self.fragments:
+                        # Minuteur côté navigateur des fragments run_every, accéléré
+                        await self.rerun('auto_refresh', self.rng.choice(sorted(self.fragments)), auto=True)
+                        next_refresh = time.monotonic() + self.refresh_every
+                    else:
+                        await self.interact()
+                    await asyncio.sleep(self.rng.expovariate(1 / self.think_time))
+        except Exception as error:
+            # Connexion refusée ou fermée par le serveur, exécution trop longue (surcharge)
+            self.errors[type(error).__name__] += 1
+
+    async def interact(self):
+        """Change un widget visible (onglet, sélecteur, curseur), sinon recharge la page"""
+        candidates = [widget_id for widget_id, (kind, _, options, _) in self.widgets.items()
+                      if kind != 'slider' or options]
+        if not candidates or self.rng.random() < self.RELOAD_RATE:
+            return await self.rerun('full_rerun')
+        widget_id = self.rng.choice(sorted(candidates))
+        kind, label, options, fragment_id = self.widgets[widget_id]
+        state = WidgetState(id=widget_id)
+        if kind == 'slider':
+            low, high = options
+            state.double_array_value.data[:] = [float(self.rng.randint(int(low), int(high)))]
+        else:
+            state.string_value = self.rng.choice(options)
+        self.states[widget_id] = state
+        await self.rerun(f"{kind}:{label}", fragment_id)
+
+    async def rerun(self, action, fragment_id='', auto=False):
+        back = BackMsg()
+        client_state = back.rerun_script
+        client_state.query_string = ''
+        client_state.fragment_id = fragment_id
+        client_state.is_auto_rerun = auto
+        client_state.widget_states.widgets.extend(self.states.values())
+        start = time.perf_counter()
+        await self.ws.send(back.SerializeToString())
+        tab_container = None
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            kind = msg.WhichOneof('type')
+            if kind == 'delta':
+                tab_container = self.register(msg.delta, tab_container)
+            elif kind == 'auto_rerun':
+                self.fragments.add(msg.auto_rerun.fragment_id)
+            elif kind == 'script_finished':
+                if msg.script_finished in FINISHED:
+                    self.latencies[action].append(time.perf_counter() - start)
+                else:
+                    self.errors[ForwardMsg.ScriptFinishedStatus.Name(msg.script_finished)] += 1
+                return
+
+    def register(self, delta, tab_container):
+        """Relève les widgets pilotables; retourne le conteneur d'onglets en cours"""
+        if delta.WhichOneof('type') == 'add_block':
+            block = delta.add_block
+            if block.WhichOneof('type') == 'tab_container' and block.tab_container.id:
+                tab_container = block.tab_container.id
+                self.widgets[tab_container] = ('tabs', 'onglets', [], delta.fragment_id)
+            elif block.WhichOneof('type') == 'tab' and tab_container in self.widgets:
+                self.widgets[tab_container][2].append(block.tab.label)
+        elif delta.WhichOneof('type') == 'new_element':
+            element = delta.new_element
+            if element.WhichOneof('type') == 'selectbox':
+                widget = element.selectbox
+                self.widgets[widget.id] = ('selectbox', widget.label, list(widget.options), delta.fragment_id)
+            elif element.WhichOneof('type') == 'slider' and element.slider.type == Slider.SLIDER:
+                widget = element.slider
+                self.widgets[widget.id] = ('slider', widget.label, (widget.min, widget.max), delta.fragment_id)
+        return tab_container
+
+
+def percentiles(values):
+    values = np.asarray(values) * 1000
+    return {'count': len(values), 'p50_ms': float(np.percentile(values, 50)),
+            'p90_ms': float(np.percentile(values, 90)), 'p99_ms': float(np.percentile(values, 99)),
+            'max_ms': float(values.max())}
+
+
+async def run_level(url, monitor, n_sessions, args, seed):
+    """Un palier: `n_sessions` sessions simultanées pendant `args.duration` secondes"""
+    rss_before = monitor.rss_bytes() if monitor else None
+    stop = asyncio.Event()
+    monitoring = asyncio.create_task(monitor.run(stop)) if monitor else None
+    if monitor:
+        monitor.reset()
+    sessions = [SimulatedSession(url, random.Random(seed + i), args.think_time, args.refresh_every,
+                                 args.timeout) for i in range(n_sessions)]
+    deadline = time.monotonic() + args.duration
+
+    async def start(session, delay):
+        # Arrivées étalées sur la première seconde
+        await asyncio.sleep(delay)
+        await session.run(deadline)
+
+    started = time.monotonic()
+    await asyncio.gather(*(start(session, i / n_sessions) for i, session in enumerate(sessions)))
+    elapsed = time.monotonic() - started
+    stop.set()
+    if monitoring:
+        await monitoring
+
+    latencies, errors = defaultdict(list), defaultdict(int)
+    for session in sessions:
+        for action, values in session.latencies.items():
+            latencies[action].extend(values)
+        for error, count in session.errors.items():
+            errors[error] += count
+    every = [value for values in latencies.values() for value in values]
+    result = {
+        'sessions': n_sessions,
+        'duration_s': elapsed,
+        'reruns': len(every),
+        'reruns_per_s': len(every) / elapsed,
+        'latency': percentiles(every) if every else None,
+        'latency_by_action': {action: percentiles(values) for action, values in sorted(latencies.items())},
+        'errors': dict(errors),
+    }
+    if monitor and monitor.rss:
+        result.update({
+            'rss_before_mb': rss_before / 2 ** 20,
+            'rss_peak_mb': max(monitor.rss) / 2 ** 20,
+            'rss_per_session_mb': (max(monitor.rss) - rss_before) / 2 ** 20 / n_sessions,
+            'cpu_mean_pct': float(np.mean(monitor.cpu)),
+            'cpu_max_pct': float(np.max(monitor.cpu)),
+        })
+    return result
+
+
+def print_level(result):
+    latency = result['latency'] or {}
+    line = (f"{result['sessions']:>5} sessions  {result['reruns_per_s']:6.1f} exéc./s  "
+            f"p50 {latency.get('p50_ms', float('nan')):7.0f} ms  p90 {latency.get('p90_ms', float('nan')):7.0f} ms  "
+            f"p99 {latency.get('p99_ms', float('nan')):7.0f} ms")
+    if 'cpu_mean_pct' in result:
+        line += (f"  CPU {result['cpu_mean_pct']:5.0f} % (max {result['cpu_max_pct']:4.0f} %)  "
+                 f"RSS {result['rss_peak_mb']:6.0f} Mo ({result['rss_per_session_mb']:+.1f} Mo/session)")
+    if result['errors']:
+        line += f"  erreurs {result['errors']}"
+    print(line)
+    for action, stats in result['latency_by_action'].items():
+        print(f"        {action:<40} n={stats['count']:<5} p50 {stats['p50_ms']:7.0f} ms  "
+              f"p99 {stats['p99_ms']:7.0f} ms")
+
+
+async def run(args, url, pid):
+    monitor = ProcessMonitor(pid) if pid and os.path.exists(f"/proc/{pid}") else None
+    # Session d'échauffement (imports, caches, données): la mémoire par session n'inclut pas le démarrage
+    await SimulatedSession(url, random.Random(0), args.think_time, args.refresh_every, args.timeout).run(0)
+    levels = []
+    for level, n_sessions in enumerate(args.sessions):
+        result = await run_level(url, monitor, n_sessions, args, seed=1000 * level)
+        print_level(result)
+        levels.append(result)
+        # Laisse le serveur terminer les exécutions en cours avant le palier suivant
+        await asyncio.sleep(args.pause)
+    return levels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--app', default='DashboardPro.py', help="script servi (ignoré avec --url)")
+    parser.add_argument('--url', help="serveur déjà démarré (par défaut: lancé par le script)")
+    parser.add_argument('--pid', type=int, help="pid du serveur désigné par --url (mesures /proc)")
+    parser.add_argument('--port', type=int, default=8599)
+    parser.add_argument('--sessions', type=lambda text: [int(v) for v in text.split(',')], default=[1, 5, 10, 25])
+    parser.add_argument('--duration', type=float, default=30, help="durée de chaque palier (s)")
+    parser.add_argument('--think-time', type=float, default=2.0, help="pause moyenne entre actions (s)")
+    parser.add_argument('--refresh-every', type=float, default=10.0,
+                        help="période des actualisations automatiques simulées (s)")
+    parser.add_argument('--timeout', type=float, default=60.0, help="délai maximal d'une exécution (s)")
+    parser.add_argument('--pause', type=float, default=2.0, help="pause entre paliers (s)")
+    parser.add_argument('--output', help="fichier JSON (défaut: benchmarks/results/load-<app>-<date>.json)")
+    args = parser.parse_args()
+    if connect is None:
+        parser.error("le client websocket nécessite le paquet websockets (pip install websockets)")
+
+    server = None
+    if args.url:
+        url, pid = args.url.rstrip('/'), args.pid
+    else:
+        # Instantané désactivé: chaque test part d'un démarrage à froid comparable
+        server = ServerProcess(args.app, args.port, env={'VENTUSKY_SNAPSHOT_PATH': ''})
+        server.wait_ready()
+        url, pid = server.url, server.pid
+    print(f"{args.url or args.app} - paliers {args.sessions}, {args.duration:.0f} s chacun")
+    try:
+        levels = asyncio.run(run(args, url, pid))
+    finally:
+        if server is not None:
+            server.stop()
+
+    report = {
+        'meta': {'timestamp': datetime.now().isoformat(timespec='seconds'), 'app': args.url or args.app,
+                 'cpu_count': os.cpu_count(), 'duration_s': args.duration, 'think_time_s': args.think_time,
+                 'refresh_every_s': args.refresh_every},
+        'levels': levels,
+    }
+    name = os.path.splitext(os.path.basename(args.app))[0] if not args.url else 'url'
+    output = args.output or os.path.join(RESULTS_DIR, f"load-{name}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Résultats: {output}")
+
+
+if __name__ == "__main__":
+    main()
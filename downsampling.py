@@ -0,0 +1,87 @@
+# downsampling.py
+"""Réduction côté serveur des séries temporelles avant leur envoi aux graphiques.
+
+Un graphique de W pixels ne peut pas afficher plus de W points distincts: au-delà,
+le volume envoyé au navigateur et le temps de rendu augmentent sans gain visuel.
+Deux méthodes sont proposées:
+- LTTB (Largest-Triangle-Three-Buckets), qui conserve la forme de la courbe;
+- min-max, qui garde le minimum et le maximum de chaque paquet et préserve donc
+  à coup sûr les pics (rafales, chutes de pression).
+"""
+import numpy as np
+
+# Largeur de référence d'un graphique pleine largeur (pixels)
+DEFAULT_CHART_WIDTH = 1200
+
+
+def point_budget(width=DEFAULT_CHART_WIDTH, points_per_pixel=1.0):
+    """Nombre de points à conserver pour un graphique de `width` pixels"""
+    return max(int(width * points_per_pixel), 3)
+
+
+def _as_numeric(x):
+    """Abscisses numériques (les dates sont converties en entiers)"""
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, max_points):
+    """Indices retenus par LTTB; le premier et le dernier point sont toujours conservés"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = _as_numeric(x)
+
+    # max_points - 2 paquets entre le premier et le dernier point
+    edges = np.append(np.linspace(1, n - 1, max_points - 1).astype(np.int64), n)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2]
+        # Sommet C: moyenne du paquet suivant
+        xc = x[end:next_end].mean()
+        yc = np.nanmean(y[end:next_end]) if np.any(~np.isnan(y[end:next_end])) else y[a]
+        # Sommet B: point du paquet courant maximisant l'aire du triangle ABC
+        area = np.abs((x[a] - xc) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (yc - y[a]))
+        a = start + (int(np.nanargmax(area)) if np.any(~np.isnan(area)) else 0)
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, max_points):
+    """Indices du minimum et du maximum de chaque paquet, dans l'ordre chronologique"""
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if max_points >= n or max_points < 4:
+        return np.arange(n)
+
+    n_buckets = (max_points - 2) // 2
+    size = -(-(n - 2) // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n - 2] = y[1:n - 1]
+    buckets = padded.reshape(n_buckets, size)
+    # Les paquets entièrement vides (remplissage) sont ignorés
+    valid = ~np.all(np.isnan(buckets), axis=1)
+    filled = np.where(np.isnan(buckets[valid]), np.inf, buckets[valid])
+    offsets = np.flatnonzero(valid)[:, None] * size + 1
+    lows = offsets[:, 0] + np.argmin(filled, axis=1)
+    highs = offsets[:, 0] + np.argmax(np.where(np.isinf(filled), -np.inf, filled), axis=1)
+    return np.unique(np.concatenate([[0, n - 1], lows, highs]))
+
+
+def downsample(frame, column, max_points, method='lttb', time_column='datetime'):
+    """Sous-ensemble de `frame` (lignes entières) représentant `column` en au plus `max_points` points"""
+    if len(frame) <= max_points:
+        return frame
+    if method == 'lttb':
+        indices = lttb_indices(frame[time_column].to_numpy(), frame[column].to_numpy(), max_points)
+    elif method == 'minmax':
+        indices = minmax_indices(frame[column].to_numpy(), max_points)
+    else:
+        raise ValueError(f"Méthode de réduction inconnue: {method}")
+    return frame.iloc[indices]
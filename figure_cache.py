@@ -0,0 +1,99 @@
+# figure_cache.py
+"""Cache LRU des figures Plotly, partagé entre sessions et borné en mémoire.
+
+Les figures sont indexées par (panneau, version des données, paramètres de vue):
+un panneau inchangé coûte une recherche dans un dictionnaire au lieu d'une
+reconstruction complète. Les figures mises en cache ne doivent pas être
+modifiées après leur construction.
+
+La taille d'une figure est estimée d'après les tableaux de ses traces (`nbytes`),
+sans la sérialiser: Streamlit la sérialise déjà à l'envoi.
+"""
+import itertools
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Forfait par figure (mise en page, modèle de thème) et par valeur non tabulaire
+FIGURE_OVERHEAD_BYTES = 16 * 1024
+VALUE_BYTES = 16
+
+_data_versions = itertools.count(1)
+
+
+def next_data_version():
+    """Numéro de version unique dans le processus, à attribuer à chaque nouveau jeu de données"""
+    return next(_data_versions)
+
+
+def payload_size(value):
+    """Taille estimée (octets) d'une propriété de trace: tableaux au poids réel, le reste au forfait"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes if value.dtype != object else VALUE_BYTES * value.size
+    if isinstance(value, dict):
+        return sum(payload_size(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(payload_size(item) for item in value)
+    return len(value) if isinstance(value, str) else VALUE_BYTES
+
+
+def figure_size(figure):
+    """Taille estimée d'une figure Plotly d'après les données de ses traces"""
+    return FIGURE_OVERHEAD_BYTES + sum(payload_size(trace._props) for trace in figure.data)
+
+
+class FigureCache:
+    """Cache LRU thread-safe dont la taille totale (estimée, voir `figure_size`) est plafonnée"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def hit_ratio(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get_or_build(self, key, builder):
+        """Retourne la figure associée à `key`, en l'appelant `builder()` si elle est absente"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        # Construction hors verrou: une autre session peut construire la même figure en parallèle
+        figure = builder()
+        size = figure_size(figure)
+        with self.lock:
+            if key not in self.entries and size <= self.max_bytes:
+                self.entries[key] = (figure, size)
+                self.total_bytes += size
+                self._evict()
+        return figure
+
+    def _evict(self):
+        """Évince les entrées les moins récemment utilisées jusqu'à respecter le plafond"""
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.total_bytes -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+
+# Cache partagé par toutes les sessions du processus
+figure_cache = FigureCache(int(os.environ.get("VENTUSKY_FIGURE_CACHE_MB", 64)) * 1024 * 1024)
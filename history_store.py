@@ -0,0 +1,168 @@
+# history_store.py
+"""Historique persistant des observations et du réseau de stations, au format Parquet.
+
+Les fichiers sont partitionnés par date puis par station (`date=AAAA-MM-JJ/
+station=ID/...`); le réseau, écrit en bloc, est partitionné par date avec la
+station en colonne (un fichier par jour plutôt qu'un par station et par jour).
+Chaque partition garde un seul fichier, dans lequel les lots successifs du jour
+sont fusionnés. Les lectures passent par `pyarrow.dataset` sur un système de
+fichiers mappé en mémoire: seules les partitions de la période demandée et les
+colonnes demandées sont lues, si bien qu'un panneau qui n'a besoin que de la
+pression sur 30 jours ne charge pas le reste de l'historique.
+
+    VENTUSKY_HISTORY_DIR=./history streamlit run DashboardPro.py
+
+pyarrow est une dépendance optionnelle: sans elle, rien n'est persisté.
+"""
+import os
+
+import pandas as pd
+
+from stations import StationArray
+
+# pyarrow (dépendance optionnelle) n'est importé qu'à l'ouverture d'un historique:
+# son import coûte plusieurs centaines de ms au démarrage
+pa = ds = pq = fs = None
+
+
+def import_pyarrow():
+    """Importe pyarrow au premier usage; retourne False s'il n'est pas installé"""
+    global pa, ds, pq, fs
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.dataset
+            import pyarrow.parquet
+            import pyarrow.fs
+        except ImportError:
+            return False
+        pa, ds, pq, fs = pyarrow, pyarrow.dataset, pyarrow.parquet, pyarrow.fs
+    return True
+
+# Clés de partitionnement (répertoires) par type de données
+PARTITIONS = {
+    'observations': ['date', 'station'],
+    'network': ['date'],
+}
+# Fichier unique de chaque partition
+DAY_FILE = 'part-0.parquet'
+
+
+class ParquetHistoryStore:
+    """Stockage Parquet partitionné (date, station), en ajout par lots"""
+
+    def __init__(self, root, time_column='datetime'):
+        if not import_pyarrow():
+            raise ImportError("ParquetHistoryStore nécessite pyarrow (pip install pyarrow)")
+        self.root = os.path.abspath(root)
+        self.time_column = time_column
+        self.filesystem = fs.LocalFileSystem(use_mmap=True)
+
+    def path(self, kind):
+        return os.path.join(self.root, kind)
+
+    def write(self, kind, frame, station=None):
+        """Écrit un lot, fusionné au fichier unique de chaque jour concerné.
+
+        Chaque partition (jour, station) ne contient qu'un fichier: le lot y est
+        fusionné (les lignes déjà présentes aux mêmes dates sont remplacées), ce qui
+        garde la lecture élaguée efficace quel que soit le nombre d'actualisations.
+        """
+        if frame.empty:
+            return 0
+        times = frame[self.time_column]
+        days = times.dt.strftime('%Y-%m-%d')
+        for day, batch in frame.groupby(days.to_numpy(), sort=False):
+            directory = os.path.join(self.path(kind), f"date={day}")
+            if station is not None:
+                directory = os.path.join(directory, f"station={station}")
+            os.makedirs(directory, exist_ok=True)
+            self._merge_day(directory, batch)
+        return len(frame)
+
+    def _merge_day(self, directory, batch):
+        """Réécrit le fichier du jour avec le lot (écriture atomique, anciens fichiers retirés)"""
+        files = sorted(name for name in os.listdir(directory) if name.endswith('.parquet'))
+        if files:
+            stored = [pq.read_table(os.path.join(directory, name)).to_pandas() for name in files]
+            batch = pd.concat(stored + [batch.reset_index(drop=True)], ignore_index=True)
+            keys = [self.time_column] + (['station'] if 'station' in batch else [])
+            batch = batch.drop_duplicates(keys, keep='last').sort_values(keys, kind='stable')
+        table = pa.Table.from_pandas(batch.reset_index(drop=True), preserve_index=False)
+        # Fichier temporaire masqué (préfixe ignoré par pyarrow.dataset), puis remplacement
+        temporary = os.path.join(directory, f".{DAY_FILE}.tmp")
+        pq.write_table(table, temporary)
+        os.replace(temporary, os.path.join(directory, DAY_FILE))
+        for name in files:
+            if name != DAY_FILE:
+                os.remove(os.path.join(directory, name))
+
+    def read(self, kind, columns=None, start=None, end=None, stations=None):
+        """Lecture élaguée: partitions de [start, end] et colonnes demandées uniquement"""
+        root = self.path(kind)
+        if not os.path.isdir(root):
+            return pd.DataFrame()
+        partitioning = ds.partitioning(pa.schema([(name, pa.string()) for name in PARTITIONS[kind]]),
+                                       flavor='hive')
+        dataset = ds.dataset(root, format='parquet', partitioning=partitioning, filesystem=self.filesystem)
+        condition = None
+        for predicate in self._predicates(start, end, stations):
+            condition = predicate if condition is None else condition & predicate
+        if columns is not None:
+            columns = list(dict.fromkeys([self.time_column, 'station', *columns]))
+        table = dataset.to_table(columns=columns, filter=condition)
+        frame = table.to_pandas()
+        if frame.empty:
+            return frame
+        # Les partitions ne sont pas ordonnées; un historique antérieur peut contenir des doublons
+        keys = [self.time_column] + (['station'] if 'station' in frame else [])
+        return (frame.sort_values(keys, kind='stable')
+                .drop_duplicates(keys, keep='last')
+                .reset_index(drop=True))
+
+    def _predicates(self, start, end, stations):
+        time = ds.field(self.time_column)
+        if start is not None:
+            start = pd.Timestamp(start)
+            yield ds.field('date') >= f"{start:%Y-%m-%d}"
+            yield time >= pa.scalar(start.value, pa.timestamp('ns'))
+        if end is not None:
+            end = pd.Timestamp(end)
+            yield ds.field('date') <= f"{end:%Y-%m-%d}"
+            yield time <= pa.scalar(end.value, pa.timestamp('ns'))
+        if stations is not None:
+            yield ds.field('station').isin([str(s) for s in stations])
+
+    # Observations de la station principale
+    def write_observations(self, frame, station):
+        return self.write('observations', frame, station)
+
+    def read_observations(self, station, columns=None, start=None, end=None):
+        frame = self.read('observations', columns, start, end, stations=[station])
+        return frame.drop(columns=[c for c in PARTITIONS['observations'] if c in frame])
+
+    # Réseau de stations
+    def write_network(self, array):
+        """Écrit le bloc station × temps × variable au format long, trié par date"""
+        frame = array.to_frame().reset_index().sort_values(self.time_column, kind='stable')
+        frame['station'] = frame['station'].astype('category')
+        self.write('network', frame)
+
+    def read_network(self, variables=None, start=None, end=None, stations=None):
+        """Bloc StationArray reconstruit depuis l'historique (None si vide)"""
+        frame = self.read('network', variables, start, end, stations)
+        if frame.empty:
+            return None
+        frame = frame.drop(columns='date', errors='ignore')
+        frames = {station: group.drop(columns='station')
+                  for station, group in frame.groupby('station', sort=True, observed=True)}
+        return StationArray.from_frames(frames, variables=[c for c in frame.columns
+                                                           if c not in (self.time_column, 'station')])
+
+
+def create_history_store():
+    """Historique configuré par VENTUSKY_HISTORY_DIR, sinon None (ou si pyarrow est absent)"""
+    root = os.environ.get("VENTUSKY_HISTORY_DIR")
+    if not root or not import_pyarrow():
+        return None
+    return ParquetHistoryStore(root)
@@ -0,0 +1,272 @@
+# metrics.py
+"""Métriques d'exploitation au format texte Prometheus, servies en HTTP local.
+
+    VENTUSKY_METRICS_PORT=9108 streamlit run DashboardPro.py
+    curl http://127.0.0.1:9108/metrics
+
+Exécutions du script, rendus et durée par panneau / onglet (via le profileur),
+durée et issue des acquisitions, taille des données publiées, sessions actives
+et cache de figures. Les valeurs d'état (taille, sessions, cache) sont lues au
+moment de la collecte, sans coût pour les rendus.
+"""
+import math
+import os
+import threading
+import time
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from figure_cache import figure_cache
+from profiling import profiler
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def format_value(value):
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def format_labels(names, values):
+    if not names:
+        return ""
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for value in values)
+    return "{" + ",".join(f'{name}="{value}"' for name, value in zip(names, escaped)) + "}"
+
+
+class Metric:
+    """Série de valeurs par combinaison d'étiquettes; `functions` sont lues à la collecte"""
+
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}
+        self.functions = {}
+        self.lock = threading.Lock()
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def set_function(self, function, owner=None):
+        """`function()` retourne une valeur, ou un dict {(étiquettes...): valeur}.
+
+        Une seule fonction par `owner`: l'enregistrer à nouveau remplace la précédente
+        (et libère ce qu'elle référençait, ex. un worker reconstruit).
+        """
+        with self.lock:
+            self.functions[owner] = function
+
+    def samples(self):
+        with self.lock:
+            samples = dict(self.values)
+            functions = list(self.functions.values())
+        for function in functions:
+            try:
+                value = function()
+            except Exception:
+                # Une collecte ne doit jamais échouer à cause d'une source d'état
+                continue
+            samples.update(value if isinstance(value, dict) else {(): value})
+        return samples
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self.samples().items()):
+            lines.append(f"{self.name}{format_labels(self.labels, key)} {format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self.lock:
+            self.values[self.key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            # Effectifs par intervalle; cumulés au rendu
+            counts[next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))] += 1
+            self.values[key] = (counts, total + value)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self.values.items()}
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = format_labels(self.labels + ('le',), key + (format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {format_value(total)}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Exposition texte Prometheus (version 0.0.4)"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+reruns = registry.register(Counter(
+    'ventusky_reruns_total', "Exécutions complètes du script Streamlit", ['dashboard']))
+panel_renders = registry.register(Counter(
+    'ventusky_panel_renders_total', "Rendus par panneau ou onglet", ['panel']))
+panel_render_seconds = registry.register(Histogram(
+    'ventusky_panel_render_seconds', "Durée de rendu par panneau ou onglet", ['panel']))
+refreshes = registry.register(Counter(
+    'ventusky_refreshes_total', "Acquisitions de données, par issue", ['dashboard', 'outcome']))
+refresh_seconds = registry.register(Histogram(
+    'ventusky_refresh_seconds', "Durée des acquisitions de données", ['dashboard']))
+refresh_age = registry.register(Gauge(
+    'ventusky_refresh_age_seconds', "Âge du dernier état publié", ['dashboard']))
+dataset_rows = registry.register(Gauge(
+    'ventusky_dataset_rows', "Lignes des données publiées", ['dashboard', 'dataset']))
+dataset_bytes = registry.register(Gauge(
+    'ventusky_dataset_bytes', "Mémoire des données publiées", ['dashboard', 'dataset']))
+active_sessions = registry.register(Gauge(
+    'ventusky_active_sessions', "Sessions Streamlit connectées"))
+figure_cache_lookups = registry.register(Counter(
+    'ventusky_figure_cache_lookups_total', "Recherches dans le cache de figures", ['result']))
+figure_cache_hit_ratio = registry.register(Gauge(
+    'ventusky_figure_cache_hit_ratio', "Taux de succès du cache de figures"))
+figure_cache_bytes = registry.register(Gauge(
+    'ventusky_figure_cache_bytes', "Taille estimée des figures en cache"))
+
+
+def observe_panel(entry):
+    panel_renders.inc(panel=entry['panel'])
+    panel_render_seconds.observe(entry['total_ms'] / 1000, panel=entry['panel'])
+
+
+def count_active_sessions():
+    # API interne de Streamlit: absente hors serveur (NaN)
+    from streamlit.runtime import Runtime
+    if not Runtime.exists():
+        return math.nan
+    return Runtime.instance()._session_mgr.num_active_sessions()
+
+
+profiler.listeners.append(observe_panel)
+active_sessions.set_function(count_active_sessions)
+figure_cache_lookups.set_function(lambda: {('hit',): figure_cache.hits, ('miss',): figure_cache.misses})
+figure_cache_hit_ratio.set_function(lambda: figure_cache.hit_ratio)
+figure_cache_bytes.set_function(lambda: figure_cache.total_bytes)
+
+
+def dataset_size(data):
+    """(lignes, octets) d'un DataFrame ou d'un bloc station × temps × variable"""
+    if hasattr(data, 'memory_usage'):
+        return len(data), int(data.memory_usage(deep=True).sum())
+    return data.values.shape[0] * data.values.shape[1], data.values.nbytes
+
+
+def timed_refresh(dashboard, produce):
+    """`produce` instrumenté: durée et issue de chaque acquisition"""
+    def wrapper():
+        start = time.perf_counter()
+        try:
+            state = produce()
+        except Exception:
+            refreshes.inc(dashboard=dashboard, outcome='error')
+            raise
+        finally:
+            refresh_seconds.observe(time.perf_counter() - start, dashboard=dashboard)
+        refreshes.inc(dashboard=dashboard, outcome='success')
+        return state
+    return wrapper
+
+
+def watch_worker(dashboard, worker, datasets=('weather_data', 'stations')):
+    """Expose l'âge et la taille des données publiées par un worker d'acquisition"""
+    refresh_age.set_function(lambda: {(dashboard,): time.time() - worker.published_at}, owner=dashboard)
+
+    def sizes(index):
+        state = worker.state
+        return {(dashboard, name): dataset_size(getattr(state, name))[index]
+                for name in datasets if getattr(state, name, None) is not None}
+
+    dataset_rows.set_function(lambda: sizes(0), owner=dashboard)
+    dataset_bytes.set_function(lambda: sizes(1), owner=dashboard)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Répond à /metrics"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render().encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_failed = False
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port=None, host='127.0.0.1'):
+    """Serveur /metrics unique du processus (port VENTUSKY_METRICS_PORT); None si non configuré ou si le port est indisponible"""
+    global _server, _server_failed
+    if port is None:
+        port = os.environ.get("VENTUSKY_METRICS_PORT")
+        if not port:
+            return None
+    with _server_lock:
+        # un échec (port occupé, invalide) est mémorisé: pas de nouvel essai à chaque rerun
+        if _server is None and not _server_failed:
+            try:
+                _server = ThreadingHTTPServer((host, int(port)), MetricsHandler)
+            except (OSError, ValueError) as error:
+                _server_failed = True
+                warnings.warn(f"Serveur /metrics non démarré sur le port {port} ({error})")
+                return None
+            threading.Thread(target=_server.serve_forever, name="ventusky-metrics", daemon=True).start()
+    return _server
@@ -0,0 +1,180 @@
+# pressure_tendency.py
+"""Tendances barométriques en flux: régression glissante mise à jour à chaque observation.
+
+Pour chaque fenêtre (3 h, 6 h, 24 h), les sommes de la droite des moindres
+carrés (n, Σt, Σt², Σp, Σtp) sont tenues à jour par ajout de l'observation
+entrante et retrait des observations sorties de la fenêtre: O(1) amorti par
+observation, quelle que soit la longueur de l'historique, et vectorisé sur
+les stations. La tendance est la pente × la durée de la fenêtre (hPa / 3 h...).
+
+Chaque observation est évaluée à son arrivée: un creusement explosif entre
+deux affichages est donc relevé, avec son heure de début. Critère retenu:
+baisse d'au moins 24 hPa en 24 h ramenée à la latitude (Sanders et Gyakum),
+et alerte précoce lorsque la tendance sur 6 h, extrapolée à 24 h, l'atteint.
+Les deux critères portent sur la borne haute de la tendance (pente + t × son
+écart type, fenêtre entièrement couverte), et l'alerte précoce doit tenir
+plusieurs observations de suite: un relevé bruité ne suffit pas à la lever.
+"""
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Fenêtres de tendance (heures)
+TENDENCY_WINDOWS = {'3h': 3, '6h': 6, '24h': 24}
+# Baisse de référence du creusement explosif, en hPa / 24 h à 60° de latitude
+EXPLOSIVE_DROP_60 = 24.0
+# Quantile (loi de Student) de la borne haute de la tendance: une baisse n'est
+# retenue que si elle dépasse le seuil au-delà de l'incertitude de la pente
+SIGNIFICANCE_T = 2.6
+
+
+def explosive_threshold(latitude=60.0):
+    """Baisse (hPa / 24 h, négative) qualifiant un creusement explosif à cette latitude"""
+    return -EXPLOSIVE_DROP_60 * abs(math.sin(math.radians(latitude))) / math.sin(math.radians(60))
+
+
+class SlidingRegression:
+    """Pente des moindres carrés sur les `hours` dernières heures, pour plusieurs séries alignées"""
+
+    def __init__(self, hours, n_series):
+        self.hours = hours
+        self.samples = deque()
+        # Sommes (n, Σt, Σt², Σy, Σty, Σy²) par série; les valeurs manquantes ne comptent pas
+        self.sums = np.zeros((6, n_series))
+
+    def terms(self, t, values):
+        valid = ~np.isnan(values)
+        y = np.where(valid, values, 0.0)
+        w = valid.astype(np.float64)
+        return np.stack([w, w * t, w * t * t, y, y * t, y * y])
+
+    def add(self, t, values):
+        """Ajoute l'observation au temps `t` (heures) et retire celles antérieures à t - hours"""
+        terms = self.terms(t, values)
+        self.samples.append((t, terms))
+        self.sums += terms
+        while self.samples[0][0] < t - self.hours:
+            self.sums -= self.samples.popleft()[1]
+
+    def slope(self):
+        """Pente (unité / heure) de chaque série; NaN avec moins de deux observations"""
+        n, st, stt, sy, sty, _ = self.sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            denominator = n * stt - st * st
+            return np.where((n >= 2) & (denominator > 1e-9), (n * sty - st * sy) / denominator, np.nan)
+
+    def slope_error(self):
+        """Écart type de la pente estimée (résidus de la droite); NaN avec moins de trois observations"""
+        n, st, stt, sy, sty, syy = self.sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sxx = stt - st * st / n
+            sxy = sty - st * sy / n
+            syy = syy - sy * sy / n
+            residual = np.maximum(syy - sxy * sxy / sxx, 0.0) / (n - 2)
+            return np.where((n >= 3) & (sxx > 1e-9), np.sqrt(residual / sxx), np.nan)
+
+    def fitted(self, t):
+        """Valeur de la droite ajustée au temps `t`"""
+        n, st, _, sy, _, _ = self.sums
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sy / n + self.slope() * (t - st / n)
+
+
+class PressureTendency:
+    """Tendances 3 h / 6 h / 24 h de chaque station et détection du creusement explosif"""
+
+    def __init__(self, stations, latitude=60.0, persistence=3, max_events=200):
+        self.stations = pd.Index(stations, name='station')
+        self.windows = dict(TENDENCY_WINDOWS)
+        self.regressions = {name: SlidingRegression(hours, len(self.stations))
+                            for name, hours in self.windows.items()}
+        self.threshold = explosive_threshold(latitude)
+        # Observations consécutives requises pour l'alerte précoce
+        self.persistence = persistence
+        # Origine des temps (les sommes restent petites) et dernière observation intégrée
+        self.origin = None
+        self.last_time = None
+        self.explosive = np.zeros(len(self.stations), dtype=bool)
+        self.warning = np.zeros(len(self.stations), dtype=bool)
+        self.warning_run = np.zeros(len(self.stations), dtype=np.int32)
+        # Débuts d'épisodes explosifs (station, heure, tendance 24 h), les plus récents
+        self.events = deque(maxlen=max_events)
+
+    def hours(self, times):
+        """Heures écoulées depuis l'origine (date isolée ou index de dates)"""
+        return (times - self.origin) / pd.Timedelta(1, 'h')
+
+    def update(self, times, values):
+        """Intègre des observations de dates croissantes; `values` de forme (temps,) ou (temps, stations).
+
+        Les dates déjà intégrées sont ignorées. Retourne le nombre d'observations ajoutées.
+        """
+        times = pd.DatetimeIndex(times)
+        values = np.asarray(values, dtype=np.float64).reshape(len(times), len(self.stations))
+        if self.last_time is not None:
+            keep = times > self.last_time
+            times, values = times[keep], values[keep]
+        if not len(times):
+            return 0
+        if self.origin is None:
+            self.origin = times[0]
+        for when, hour, row in zip(times, self.hours(times), values):
+            for regression in self.regressions.values():
+                regression.add(hour, row)
+            self.check(when)
+        self.last_time = times[-1]
+        return len(times)
+
+    def update_from_array(self, array, end, start=None):
+        """Intègre les pas de temps d'un bloc station × temps postérieurs à la dernière date, jusqu'à `end`"""
+        first = 0 if start is None else int(array.times.searchsorted(pd.Timestamp(start), side='left'))
+        stop = int(array.times.searchsorted(pd.Timestamp(end), side='right'))
+        return self.update(array.times[first:stop], array.variable('pressure')[:, first:stop].T)
+
+    def tendency(self, window):
+        """Tendance (hPa sur la fenêtre) de chaque station"""
+        return self.regressions[window].slope() * self.windows[window]
+
+    def confident_tendency(self, window):
+        """Borne haute de la tendance (hPa sur la fenêtre), NaN tant que la fenêtre n'est pas couverte.
+
+        Comparée au seuil, elle ne retient qu'une baisse significative: le bruit
+        des mesures élargit l'incertitude de la pente au lieu de déclencher l'alerte.
+        """
+        regression = self.regressions[window]
+        hours = self.windows[window]
+        bound = regression.slope() + SIGNIFICANCE_T * regression.slope_error()
+        return np.where(regression.sums[0] >= hours, bound * hours, np.nan)
+
+    def check(self, when):
+        """Évalue le creusement explosif à l'arrivée de l'observation de `when`"""
+        tendency = self.tendency('24h')
+        explosive = self.confident_tendency('24h') <= self.threshold
+        # Alerte précoce: baisse 6 h significative, extrapolée à 24 h, sur `persistence` observations
+        rapid = self.confident_tendency('6h') * 24 / self.windows['6h'] <= self.threshold
+        self.warning_run = np.where(rapid, self.warning_run + 1, 0)
+        self.warning = self.warning_run >= self.persistence
+        for station in np.flatnonzero(explosive & ~self.explosive):
+            self.events.append({'station': self.stations[station], 'time': when,
+                                'tendency_24h': float(tendency[station])})
+        self.explosive = explosive
+
+    def table(self):
+        """Tendances courantes et indicateurs, une ligne par station"""
+        frame = pd.DataFrame({f"tendency_{name}": self.tendency(name) for name in self.windows},
+                             index=self.stations)
+        frame['explosive'] = self.explosive
+        frame['warning'] = self.warning
+        return frame
+
+    def trend_line(self, window, station=0):
+        """Extrémités (dates, valeurs) de la droite ajustée sur la fenêtre, pour une station"""
+        if self.last_time is None:
+            return None
+        end = self.hours(self.last_time)
+        hours = np.array([end - self.windows[window], end])
+        regression = self.regressions[window]
+        values = [regression.fitted(hour)[station] for hour in hours]
+        return self.origin + pd.to_timedelta(hours, unit='h'), np.array(values)
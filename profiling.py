@@ -0,0 +1,155 @@
+# profiling.py
+"""Temps de rendu de chaque panneau, décomposé par phase.
+
+Chaque rendu d'un panneau instrumenté (`@profiler.panel("nom")`) est découpé en:
+- build: obtention des figures (recherche dans le cache, construction si absente);
+- serialize: sérialisation et envoi des graphiques au navigateur (`profiler.chart`);
+- compute: le reste (préparation des données, métriques, tableaux).
+Les phases d'un panneau imbriqué (panneau dans un onglet) comptent aussi pour
+son parent. Le volume envoyé n'est relevé qu'en mode détaillé (overlay affiché
+ou journal actif), car il coûte une sérialisation supplémentaire.
+
+    VENTUSKY_PERF_LOG=perf.jsonl   (une ligne JSON par rendu de panneau)
+
+L'overlay s'affiche en ajoutant `?perf=1` à l'URL du dashboard.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from figure_cache import figure_cache
+
+PHASES = ('compute', 'build', 'serialize')
+
+
+class PanelProfiler:
+    """Mesures des derniers rendus de chaque panneau, partagées entre sessions (thread-safe)"""
+
+    def __init__(self, log_path=None, history=200):
+        self.log_path = log_path
+        self.records = defaultdict(lambda: deque(maxlen=history))
+        self.lock = threading.Lock()
+        # Fonctions appelées à chaque rendu terminé (export de métriques)
+        self.listeners = []
+        # Pile des panneaux en cours et mode détaillé, propres à chaque exécution de script
+        self.local = threading.local()
+
+    @property
+    def detailed(self):
+        return self.log_path is not None or getattr(self.local, 'detailed', False)
+
+    def set_detailed(self, enabled):
+        """Active le relevé des volumes pour l'exécution courante (overlay affiché)"""
+        self.local.detailed = enabled
+
+    def _stack(self):
+        if not hasattr(self.local, 'stack'):
+            self.local.stack = []
+        return self.local.stack
+
+    def panel(self, name):
+        """Décorateur: chaque appel est mesuré comme un rendu du panneau `name`"""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.measure(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @contextmanager
+    def measure(self, name):
+        """Mesure le bloc comme un rendu du panneau `name`"""
+        stack = self._stack()
+        record = {'panel': name, 'build': 0.0, 'serialize': 0.0, 'payload_bytes': 0}
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['total'] = time.perf_counter() - start
+            stack.pop()
+            record['compute'] = max(record['total'] - record['build'] - record['serialize'], 0.0)
+            self.record(record)
+
+    @contextmanager
+    def phase(self, phase):
+        """Attribue la durée du bloc à `phase` pour tous les panneaux en cours"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            for record in self._stack():
+                record[phase] += elapsed
+
+    def add_payload(self, nbytes):
+        for record in self._stack():
+            record['payload_bytes'] += nbytes
+
+    def chart(self, figure, **kwargs):
+        """st.plotly_chart mesuré (phase serialize, volume en mode détaillé)"""
+        if self.detailed:
+            self.add_payload(len(figure.to_json()))
+        with self.phase('serialize'):
+            st.plotly_chart(figure, **kwargs)
+
+    def record(self, record):
+        """Enregistre un rendu terminé (et l'ajoute au journal JSON s'il est actif)"""
+        entry = {'time': time.time(), 'panel': record['panel'],
+                 **{f"{name}_ms": round(record[name] * 1000, 3) for name in ('total',) + PHASES},
+                 'payload_bytes': record['payload_bytes'] if self.detailed else None}
+        with self.lock:
+            self.records[record['panel']].append(entry)
+            if self.log_path is not None:
+                with open(self.log_path, 'a', encoding='utf-8') as log:
+                    log.write(json.dumps(entry) + "\n")
+        for listener in self.listeners:
+            listener(entry)
+
+    def summary(self):
+        """Une ligne par panneau: rendus, dernier / moyen / p95 total et moyenne par phase"""
+        with self.lock:
+            records = {panel: list(entries) for panel, entries in self.records.items()}
+        rows = {}
+        for panel, entries in records.items():
+            totals = np.array([entry['total_ms'] for entry in entries])
+            payloads = [entry['payload_bytes'] for entry in entries if entry['payload_bytes'] is not None]
+            rows[panel] = {
+                'renders': len(entries),
+                'last_ms': totals[-1],
+                'mean_ms': totals.mean(),
+                'p95_ms': np.percentile(totals, 95),
+                **{f"{name}_ms": np.mean([entry[f"{name}_ms"] for entry in entries]) for name in PHASES},
+                'payload_kb': np.mean(payloads) / 1024 if payloads else np.nan,
+            }
+        frame = pd.DataFrame.from_dict(rows, orient='index')
+        return frame.sort_values('p95_ms', ascending=False) if not frame.empty else frame
+
+    def overlay(self):
+        """Tableau des mesures, à afficher en fin de page"""
+        with st.expander("⏱️ Performances des panneaux", expanded=True):
+            summary = self.summary()
+            if summary.empty:
+                st.caption("Aucun rendu mesuré")
+            else:
+                st.dataframe(summary.round(1), use_container_width=True)
+            st.caption(f"Cache de figures: {len(figure_cache)} figures, "
+                       f"{figure_cache.total_bytes / 1024 ** 2:.1f} Mo, "
+                       f"taux de succès {figure_cache.hit_ratio:.0%}")
+
+    def clear(self):
+        with self.lock:
+            self.records.clear()
+
+
+# Mesures partagées par toutes les sessions du processus
+profiler = PanelProfiler(os.environ.get("VENTUSKY_PERF_LOG") or None)
@@ -0,0 +1,88 @@
+# refresh_worker.py
+"""Acquisition des données en arrière-plan, découplée du rendu des pages.
+
+Un thread unique par processus produit périodiquement un nouvel état et le
+publie; les rendus lisent uniquement le dernier état publié. La latence d'un
+rendu ne dépend donc plus de celle de la source, et N spectateurs ne
+provoquent qu'une acquisition par période au lieu de N.
+
+    VENTUSKY_REFRESH_SECONDS=60   (période d'acquisition)
+
+Un état publié n'est plus jamais modifié: l'acquisition suivante en construit
+un nouveau. Un échec d'acquisition laisse l'état précédent en service.
+"""
+import os
+import threading
+import time
+import warnings
+
+
+def refresh_period(default):
+    """Période d'acquisition (secondes), configurable par VENTUSKY_REFRESH_SECONDS"""
+    return float(os.environ.get("VENTUSKY_REFRESH_SECONDS", default))
+
+
+class RefreshWorker:
+    """Thread démon qui appelle `produce()` toutes les `interval` secondes et publie son résultat"""
+
+    def __init__(self, produce, interval, state=None, fresh=False, name="ventusky-refresh"):
+        self.produce = produce
+        self.interval = interval
+        # `state` vient d'être produit: pas de nouvelle acquisition avant une période
+        self.fresh = state is not None and fresh
+        # Dernier état publié, date de publication et dernière erreur d'acquisition
+        self.state = state
+        self.published_at = None if state is None else time.time()
+        self.last_error = None
+        self._published = threading.Event()
+        if state is not None:
+            self._published.set()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=name, daemon=True)
+
+    @property
+    def ready(self):
+        return self._published.is_set()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def run(self):
+        # Première acquisition immédiate (après une période si l'état initial est récent),
+        # puis une par période (ou sur demande)
+        if self.fresh:
+            self._wake.wait(self.interval)
+        while not self._stopped.is_set():
+            self._wake.clear()
+            self.update()
+            self._wake.wait(self.interval)
+
+    def update(self):
+        """Une acquisition; l'état n'est remplacé qu'en cas de succès"""
+        try:
+            state = self.produce()
+        except Exception as error:
+            self.last_error = error
+            warnings.warn(f"Acquisition en échec, état précédent conservé ({error!r})")
+            return
+        # Une seule affectation: un rendu concurrent lit l'ancien état ou le nouveau
+        self.state = state
+        self.published_at = time.time()
+        self.last_error = None
+        self._published.set()
+
+    def latest(self, timeout=None):
+        """Dernier état publié; attend la première publication au besoin"""
+        if not self._published.wait(timeout):
+            raise TimeoutError("Aucun état publié par le worker d'acquisition")
+        return self.state
+
+    def trigger(self):
+        """Demande une acquisition immédiate (sans attendre son résultat)"""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
@@ -0,0 +1,102 @@
+# rollups.py
+"""Agrégats multi-résolution (jour, mois, cycle diurne) tenus à jour par lots.
+
+Chaque lot d'heures nouvelles est agrégé une seule fois puis fusionné dans des
+tables de somme / effectif / min / max: les panneaux climatiques lisent ces
+tables (quelques lignes par jour ou par mois) au lieu de regrouper tout
+l'historique horaire à chaque affichage. Les agrégats survivent à l'éviction de
+la fenêtre glissante, ce qui permet une climatologie sur plusieurs années.
+"""
+import numpy as np
+import pandas as pd
+
+ROLLUP_COLUMNS = ['temperature', 'humidity', 'pressure', 'wind_speed', 'precipitation']
+STATS = ['sum', 'count', 'min', 'max']
+
+
+class PeriodRollup:
+    """Agrégats par période calendaire, alimentés dans l'ordre chronologique"""
+
+    def __init__(self, freq, columns=ROLLUP_COLUMNS):
+        self.freq = freq
+        self.columns = list(columns)
+        self.table = None
+
+    def __len__(self):
+        return 0 if self.table is None else len(self.table)
+
+    def update(self, frame, time_column='datetime'):
+        """Fusionne un lot d'heures postérieures (ou égales) à la dernière période connue"""
+        if frame.empty:
+            return
+        periods = frame[time_column].dt.to_period(self.freq).rename('period')
+        batch = frame[self.columns].groupby(periods).agg(STATS)
+        if self.table is None:
+            self.table = batch
+            return
+        if batch.index[0] < self.table.index[-1]:
+            raise ValueError("Lot antérieur à la dernière période agrégée")
+        if batch.index[0] == self.table.index[-1]:
+            # Seule la dernière période peut chevaucher le lot
+            self.table.iloc[-1] = merge_stats(self.table.iloc[-1], batch.iloc[0])
+            batch = batch.iloc[1:]
+        if not batch.empty:
+            self.table = pd.concat([self.table, batch])
+
+    def stat(self, stat):
+        """Table (périodes × variables) d'une statistique"""
+        return self.table.xs(stat, axis=1, level=1)
+
+    def mean(self):
+        return self.stat('sum') / self.stat('count').where(self.stat('count') > 0)
+
+
+class DiurnalRollup:
+    """Somme et effectif par heure de la journée (24 lignes), pour le cycle diurne moyen"""
+
+    def __init__(self, columns=ROLLUP_COLUMNS):
+        self.columns = list(columns)
+        self.sums = np.zeros((24, len(self.columns)))
+        self.counts = np.zeros((24, len(self.columns)), dtype=np.int64)
+
+    def update(self, frame, time_column='datetime'):
+        """Ajoute un lot d'heures, quel que soit son ordre"""
+        if frame.empty:
+            return
+        # Heure précalculée à l'ingestion si disponible
+        hours = (frame['hour'] if 'hour' in frame else frame[time_column].dt.hour).to_numpy()
+        values = frame[self.columns].to_numpy(np.float64)
+        valid = ~np.isnan(values)
+        np.add.at(self.sums, hours, np.where(valid, values, 0.0))
+        np.add.at(self.counts, hours, valid)
+
+    def mean(self):
+        """Moyenne de chaque variable par heure de la journée"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = self.sums / np.where(self.counts > 0, self.counts, np.nan)
+        return pd.DataFrame(means, index=pd.RangeIndex(24, name='hour'), columns=self.columns)
+
+
+def merge_stats(left, right):
+    """Combine deux lignes d'agrégats (somme, effectif, min, max) d'une même période"""
+    merged = left.copy()
+    for column in left.index.get_level_values(0).unique():
+        merged[(column, 'sum')] = left[(column, 'sum')] + right[(column, 'sum')]
+        merged[(column, 'count')] = left[(column, 'count')] + right[(column, 'count')]
+        merged[(column, 'min')] = np.fmin(left[(column, 'min')], right[(column, 'min')])
+        merged[(column, 'max')] = np.fmax(left[(column, 'max')], right[(column, 'max')])
+    return merged
+
+
+class WeatherRollups:
+    """Agrégats journaliers, mensuels et diurnes d'une série horaire"""
+
+    def __init__(self, columns=ROLLUP_COLUMNS):
+        self.daily = PeriodRollup('D', columns)
+        self.monthly = PeriodRollup('M', columns)
+        self.diurnal = DiurnalRollup(columns)
+
+    def update(self, frame, time_column='datetime'):
+        """Intègre un lot d'heures nouvelles dans toutes les résolutions"""
+        for rollup in (self.daily, self.monthly, self.diurnal):
+            rollup.update(frame, time_column)
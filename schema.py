@@ -0,0 +1,70 @@
+# schema.py
+"""Schéma de stockage compact des séries météo.
+
+Les variables continues sont stockées en float32 (précision largement
+supérieure à celle des capteurs), les grandeurs bornées à résolution entière
+(direction en degrés, humidité et nébulosité en %) en int16 après mise à
+l'échelle, et les libellés en catégories pandas. La conversion est faite une
+fois à l'ingestion; `memory_report` mesure le gain obtenu.
+"""
+import numpy as np
+import pandas as pd
+
+from stations import RISK_LEVELS
+
+# Variables continues: float32
+FLOAT_COLUMNS = ['temperature', 'pressure', 'wind_speed', 'precipitation', 'visibility',
+                 'uv_index', 'dew_point', 'feels_like', 'gust_speed', 'heat_index',
+                 'lat', 'lon', 'intensity', 'radius']
+
+# Variables entières: (type, résolution dans l'unité physique)
+SCALED_COLUMNS = {
+    'wind_direction': (np.int16, 1.0),   # degrés
+    'humidity': (np.int16, 1.0),         # %
+    'cloud_cover': (np.int16, 1.0),      # %
+}
+
+# Libellés: catégories (ordonnées si la liste est fixée, déduites des données sinon)
+CATEGORICAL_COLUMNS = {
+    'current_threat': list(RISK_LEVELS),
+    'station': None,
+}
+
+
+def apply_schema(frame):
+    """Copie de `frame` convertie au schéma compact (colonnes absentes ignorées)"""
+    converted = {}
+    for column in frame.columns:
+        values = frame[column]
+        if column in FLOAT_COLUMNS:
+            converted[column] = values.to_numpy(np.float32)
+        elif column in SCALED_COLUMNS:
+            dtype, resolution = SCALED_COLUMNS[column]
+            scaled = values.to_numpy(np.float64) / resolution
+            if np.isnan(scaled).any():
+                # Les entiers ne représentent pas les valeurs manquantes
+                converted[column] = values.to_numpy(np.float32)
+            else:
+                info = np.iinfo(dtype)
+                converted[column] = np.clip(np.rint(scaled), info.min, info.max).astype(dtype)
+        elif column in CATEGORICAL_COLUMNS and not isinstance(values.dtype, pd.CategoricalDtype):
+            categories = CATEGORICAL_COLUMNS[column]
+            converted[column] = pd.Categorical(values, categories=categories, ordered=categories is not None)
+        else:
+            converted[column] = values
+    return pd.DataFrame(converted, index=frame.index)
+
+
+def memory_report(frame, reference=None):
+    """Octets par colonne (et type), comparés si besoin à un frame de référence"""
+    usage = frame.memory_usage(deep=True, index=True)
+    report = pd.DataFrame({'dtype': frame.dtypes.astype(str), 'bytes': usage})
+    report.loc['Index', 'dtype'] = type(frame.index).__name__
+    if reference is not None:
+        report['reference_bytes'] = reference.memory_usage(deep=True, index=True)
+        report['ratio'] = report['reference_bytes'] / report['bytes']
+    total = report[[c for c in report if c.endswith('bytes')]].sum()
+    report.loc['Total', total.index] = total
+    if reference is not None:
+        report.loc['Total', 'ratio'] = total['reference_bytes'] / total['bytes']
+    return report
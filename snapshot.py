@@ -0,0 +1,60 @@
+# snapshot.py
+"""Instantané binaire de l'état des analytics, pour un démarrage à chaud.
+
+Après chaque actualisation, l'état calculé (fenêtre de données, agrégats,
+réseau, tempêtes, prédictions, alertes) est sérialisé dans un fichier local.
+Au démarrage suivant (déploiement, redémarrage après incident), cet état est
+servi immédiatement et l'actualisation se fait en arrière-plan.
+
+    VENTUSKY_SNAPSHOT_PATH=/var/lib/ventusky/pro.pkl   (non défini ou vide: désactivé)
+    VENTUSKY_SNAPSHOT_MAX_AGE=24                       (heures)
+
+Le fichier est un pickle: charger un fichier modifiable par un tiers revient à
+exécuter son code. L'instantané n'est donc activé que sur demande, vers un
+chemin lisible et modifiable uniquement par le compte qui exécute le dashboard.
+"""
+import os
+import pickle
+import tempfile
+import time
+
+# À incrémenter à chaque changement incompatible de l'état sérialisé
+SNAPSHOT_VERSION = 6
+
+
+def snapshot_path():
+    """Chemin configuré par VENTUSKY_SNAPSHOT_PATH, None si non défini (désactivé par défaut)"""
+    return os.environ.get("VENTUSKY_SNAPSHOT_PATH") or None
+
+
+def save_snapshot(state, path):
+    """Écrit l'état de façon atomique (fichier temporaire puis renommage)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    payload = {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'state': state}
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_snapshot(path, max_age_hours=None):
+    """État sauvegardé, ou None s'il est absent, trop ancien, d'une autre version ou illisible"""
+    if path is None or not os.path.exists(path):
+        return None
+    if max_age_hours is None:
+        max_age_hours = float(os.environ.get("VENTUSKY_SNAPSHOT_MAX_AGE", 24))
+    try:
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception:
+        return None
+    if payload.get('version') != SNAPSHOT_VERSION:
+        return None
+    if time.time() - payload['saved_at'] > max_age_hours * 3600:
+        return None
+    return payload['state']
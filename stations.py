@@ -0,0 +1,200 @@
+# stations.py
+"""Modèle multi-stations vectorisé: bloc colonnaire station × temps × variable.
+
+Toutes les métriques et évaluations de risque sont calculées en une passe NumPy
+sur l'ensemble du réseau, sans boucle ni instanciation par station.
+"""
+import os
+import zlib
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+# Variables simulées pour chaque station du réseau
+STATION_VARIABLES = ['temperature', 'humidity', 'pressure', 'wind_speed', 'wind_direction',
+                     'precipitation', 'cloud_cover', 'visibility', 'uv_index', 'dew_point',
+                     'feels_like', 'gust_speed', 'heat_index']
+
+# Latitude du réseau par défaut (stations 974-*: La Réunion)
+NETWORK_LATITUDE = -21.1
+
+# Seuils (modéré, élevé) de l'évaluation des risques, repris de create_risk_assessment
+RISK_THRESHOLDS = {
+    'wind_speed': (40, 60),
+    'precipitation': (5, 10),
+}
+HEAT_THRESHOLD = 35
+COLD_THRESHOLD = -5
+RISK_LEVELS = np.array(["Faible", "Modéré", "Élevé"])
+
+
+class StationArray:
+    """Bloc float32 de forme (stations, temps, variables) avec ses index"""
+
+    def __init__(self, stations, times, variables, values):
+        self.stations = pd.Index(stations, name='station')
+        self.times = pd.DatetimeIndex(times, name='datetime')
+        self.variables = list(variables)
+        self.values = np.asarray(values, dtype=np.float32)
+        expected = (len(self.stations), len(self.times), len(self.variables))
+        if self.values.shape != expected:
+            raise ValueError(f"Forme {self.values.shape} incompatible avec {expected}")
+
+    @classmethod
+    def from_frames(cls, frames, variables=None):
+        """Construit le bloc à partir de {station: DataFrame}, alignés sur l'union des dates"""
+        frames = {station: frame.set_index('datetime') for station, frame in frames.items()}
+        if variables is None:
+            variables = [v for v in STATION_VARIABLES
+                         if all(v in frame for frame in frames.values())]
+        times = frames[next(iter(frames))].index
+        for frame in frames.values():
+            times = times.union(frame.index)
+        values = np.stack([frame.reindex(index=times, columns=variables).to_numpy(np.float32)
+                           for frame in frames.values()])
+        return cls(list(frames), times, variables, values)
+
+    def __len__(self):
+        return len(self.stations)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def variable(self, name):
+        """Vue (stations, temps) d'une variable, sans copie"""
+        return self.values[:, :, self.variables.index(name)]
+
+    def index_at(self, when):
+        """Indice du dernier pas de temps <= when"""
+        return max(int(self.times.searchsorted(pd.Timestamp(when), side='right')) - 1, 0)
+
+    def append(self, other):
+        """Nouveau bloc prolongé par les pas de temps de `other` postérieurs aux nôtres"""
+        if list(other.stations) != list(self.stations) or other.variables != self.variables:
+            raise ValueError("Stations ou variables incompatibles")
+        keep = other.times > self.times[-1] if len(self.times) else slice(None)
+        return StationArray(self.stations, self.times.append(other.times[keep]), self.variables,
+                            np.concatenate([self.values, other.values[:, keep, :]], axis=1))
+
+    def evict_before(self, cutoff):
+        """Nouveau bloc sans les pas de temps antérieurs à `cutoff` (vue, sans copie)"""
+        first = int(self.times.searchsorted(pd.Timestamp(cutoff), side='left'))
+        return StationArray(self.stations, self.times[first:], self.variables, self.values[:, first:, :])
+
+    def truncate_after(self, cutoff):
+        """Nouveau bloc sans les pas de temps postérieurs à `cutoff` (vue, sans copie)"""
+        stop = int(self.times.searchsorted(pd.Timestamp(cutoff), side='right'))
+        return StationArray(self.stations, self.times[:stop], self.variables, self.values[:, :stop, :])
+
+    def to_frame(self):
+        """Vue longue indexée par (station, datetime)"""
+        index = pd.MultiIndex.from_product([self.stations, self.times])
+        return pd.DataFrame(self.values.reshape(-1, len(self.variables)),
+                            index=index, columns=self.variables)
+
+
+def generate_station_array(stations, start, end, seed=None):
+    """Simule tout un réseau en une passe vectorisée (cycle diurne, tendance, bruit).
+    
+    Le temps est compté en heures absolues et le climat local de chaque station
+    est dérivé de la liste des stations: deux appels sur des périodes successives
+    se raccordent, ce qui permet de ne simuler que les heures nouvelles.
+    """
+    rng = np.random.default_rng(seed)
+    times = pd.date_range(start=start, end=end, freq='h')
+    n_stations, n_times = len(stations), len(times)
+    shape = (n_stations, n_times)
+    t = times.values.astype('datetime64[h]').astype(np.float64)[None, :]
+
+    # Climat local propre à chaque station (altitude, exposition, relief)
+    climate = np.random.default_rng(zlib.crc32(",".join(stations).encode()))
+    base_temp = climate.normal(25, 3, (n_stations, 1))
+    base_pressure = climate.normal(1013, 3, (n_stations, 1))
+    exposure = climate.uniform(0.5, 1.5, (n_stations, 1))
+    phase = climate.uniform(0, 2 * np.pi, (n_stations, 1))
+    direction = climate.uniform(0, 360, (n_stations, 1))
+
+    temperature = (base_temp + np.sin(t * 0.01 + phase) * 2
+                   + np.sin(t * 2 * np.pi / 24) * 8 + rng.normal(0, 1.5, shape))
+    humidity = np.clip(rng.normal(65, 12, shape) + np.sin(t * 0.05 + phase) * 10, 20, 95)
+    wind_speed = np.maximum((rng.gamma(1.5, 2, shape) + 3 + rng.exponential(0.3, shape) * 15
+                             + np.sin(t * 2 * np.pi / 24) * 2) * exposure, 0)
+    rain_prob = 0.3 + np.sin(t * 2 * np.pi / 24) * 0.2
+
+    data = {
+        'temperature': temperature,
+        'humidity': humidity,
+        'pressure': base_pressure + rng.normal(0, 8, shape) + np.sin(t * 0.02 + phase) * 5,
+        'wind_speed': wind_speed,
+        'wind_direction': (direction + np.sin(t * 0.02 + phase) * 90 + rng.normal(0, 10, shape)) % 360,
+        'precipitation': rng.binomial(1, np.broadcast_to(rain_prob, shape)) * rng.exponential(2, shape),
+        'cloud_cover': np.clip(rng.normal(50, 25, shape) + np.sin(t * 0.03) * 20, 0, 100),
+        'visibility': np.clip(rng.normal(15, 5, shape) - rng.exponential(0.5, shape) * 10, 1, 30),
+        'uv_index': np.clip(np.abs(np.sin(t * 0.1)) * 10 + rng.normal(0, 1, shape), 0, 12),
+        'dew_point': rng.normal(15, 5, shape) + np.sin(t * 0.05) * 3,
+        'feels_like': temperature + rng.normal(0, 2, shape),
+        'gust_speed': wind_speed * 1.3 + rng.gamma(3, 2, shape),
+        'heat_index': temperature + 0.5 * (humidity / 100) * (temperature - 20),
+    }
+    values = np.stack([data[v].astype(np.float32) for v in STATION_VARIABLES], axis=-1)
+    return StationArray(stations, times, STATION_VARIABLES, values)
+
+
+def network_latitude():
+    """Latitude du réseau (seuils ramenés à la latitude), configurable par VENTUSKY_LATITUDE"""
+    return float(os.environ.get("VENTUSKY_LATITUDE", NETWORK_LATITUDE))
+
+
+def default_station_ids(n_stations):
+    """Identifiants de stations simulées du réseau"""
+    return [f"974-{i:04d}" for i in range(1, n_stations + 1)]
+
+
+def station_metrics(array, when=None):
+    """Valeur courante, variation horaire, min/max/moyenne 24h de chaque variable, par station"""
+    idx = array.index_at(datetime.now() if when is None else when)
+    current = array.values[:, idx, :]
+    previous = array.values[:, max(idx - 1, 0), :]
+    last_24h = array.values[:, max(idx - 23, 0):idx + 1, :]
+
+    columns = pd.MultiIndex.from_product([['current', 'delta', 'min_24h', 'max_24h', 'mean_24h'],
+                                          array.variables])
+    table = np.concatenate([current, current - previous, last_24h.min(axis=1),
+                            last_24h.max(axis=1), last_24h.mean(axis=1)], axis=1)
+    return pd.DataFrame(table, index=array.stations, columns=columns)
+
+
+def risk_categories(codes):
+    """Niveaux de risque ordonnés (catégories pandas) à partir de codes 0/1/2"""
+    return pd.Categorical.from_codes(codes, categories=RISK_LEVELS, ordered=True)
+
+
+def assess_station_risks(array, when=None):
+    """Niveaux de risque vent / pluie / température de toutes les stations en une passe"""
+    idx = array.index_at(datetime.now() if when is None else when)
+    risks = {}
+    for variable, (moderate, high) in RISK_THRESHOLDS.items():
+        current = array.variable(variable)[:, idx]
+        risks[variable] = risk_categories((current > moderate).astype(np.int8) + (current > high))
+    temperature = array.variable('temperature')[:, idx]
+    extreme = (temperature > HEAT_THRESHOLD) | (temperature < COLD_THRESHOLD)
+    risks['temperature'] = risk_categories(2 * extreme.astype(np.int8))
+    return pd.DataFrame(risks, index=array.stations)
+
+
+def station_alerts(array, wind_threshold, rain_threshold, when=None):
+    """Stations dépassant les seuils d'alerte vent / pluie au pas de temps courant"""
+    idx = array.index_at(datetime.now() if when is None else when)
+    wind = array.variable('wind_speed')[:, idx]
+    rain = array.variable('precipitation')[:, idx]
+    triggered = (wind > wind_threshold) | (rain > rain_threshold)
+    return pd.DataFrame({'wind_speed': wind[triggered], 'precipitation': rain[triggered]},
+                        index=array.stations[triggered])
+
+
+def default_network_window(days_back, days_forward):
+    """Bornes de la fenêtre simulée, alignées sur l'heure courante"""
+    now = datetime.now().replace(minute=0, second=0, microsecond=0)
+    return now - timedelta(days=days_back), now + timedelta(days=days_forward)
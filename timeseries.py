@@ -0,0 +1,158 @@
+# timeseries.py
+"""Stockage des séries horaires: fenêtre glissante en ajout seul.
+
+Seules les heures nouvellement arrivées sont écrites dans le tampon; les heures
+expirées sont évincées en avançant un indice de début. Le tampon est compacté
+(ou agrandi) uniquement lorsqu'il est plein, ce qui rend l'ajout O(nouvelles
+lignes) en coût amorti, quelle que soit la longueur de la fenêtre. La fin de
+la série (prévisions) peut être retirée puis remplacée par une acquisition
+plus récente, sans toucher aux heures observées.
+
+La lecture par période passe par un index de dates trié: une fenêtre est
+localisée par recherche dichotomique et servie comme tranche, sans copie.
+Les séries stockées sont partagées entre sessions et ne sont jamais modifiées
+par l'affichage: les attributs dérivés sont calculés à l'ingestion.
+"""
+import numpy as np
+import pandas as pd
+
+# Attributs calendaires dérivés une fois à l'ingestion (entiers compacts)
+CALENDAR_COLUMNS = {'hour': np.int8, 'day': np.int8, 'month': np.int8}
+
+
+def add_calendar_columns(frame, time_column='datetime'):
+    """Copie de `frame` enrichie des colonnes heure / jour / mois en int8"""
+    times = frame[time_column].dt
+    return frame.assign(**{name: getattr(times, name).to_numpy().astype(dtype)
+                           for name, dtype in CALENDAR_COLUMNS.items()})
+
+
+class AppendOnlyWindow:
+    """Tampon colonnaire trié par date, à ajout seul et éviction par le début"""
+
+    def __init__(self, time_column='datetime', min_capacity=64):
+        self.time_column = time_column
+        self.min_capacity = min_capacity
+        self.buffers = {}
+        self.start = 0
+        self.end = 0
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def capacity(self):
+        return len(self.buffers[self.time_column]) if self.buffers else 0
+
+    @property
+    def times(self):
+        """Vue (sans copie) des dates présentes dans la fenêtre"""
+        return self.buffers[self.time_column][self.start:self.end] if self.buffers else np.array([], 'datetime64[ns]')
+
+    @property
+    def last_time(self):
+        """Date de la dernière ligne, ou None si la fenêtre est vide"""
+        return pd.Timestamp(self.buffers[self.time_column][self.end - 1]) if len(self) else None
+
+    def last_value(self, column, default=None, before=None):
+        """Dernière valeur d'une colonne (antérieure à `before` si donné), ou `default` à défaut"""
+        count = len(self) if before is None else int(
+            np.searchsorted(self.times, np.datetime64(pd.Timestamp(before)), side='left'))
+        return self.buffers[column][self.start + count - 1] if count else default
+
+    def append(self, frame):
+        """Ajoute les lignes postérieures à la dernière date connue; retourne le nombre ajouté"""
+        if self.last_time is not None:
+            frame = frame[frame[self.time_column] > self.last_time]
+        count = len(frame)
+        if count == 0:
+            return 0
+
+        if not self.buffers:
+            capacity = max(2 * count, self.min_capacity)
+            self.buffers = {name: np.empty(capacity, dtype=frame[name].to_numpy().dtype)
+                            for name in frame.columns}
+        elif self.end + count > self.capacity:
+            self._reserve(count)
+
+        for name, buffer in self.buffers.items():
+            values = frame[name].to_numpy()
+            if not np.can_cast(values.dtype, buffer.dtype, casting='same_kind'):
+                # Ex.: colonne entière reçue avec des valeurs manquantes (float)
+                buffer = self.buffers[name] = buffer.astype(np.result_type(buffer.dtype, values.dtype))
+            buffer[self.end:self.end + count] = values
+        self.end += count
+        return count
+
+    def evict_before(self, cutoff):
+        """Évince les lignes antérieures à `cutoff`; retourne le nombre évincé"""
+        evicted = int(np.searchsorted(self.times, np.datetime64(pd.Timestamp(cutoff)), side='left'))
+        self.start += evicted
+        return evicted
+
+    def truncate_after(self, cutoff):
+        """Retire les lignes postérieures à `cutoff` (elles seront réécrites); retourne le nombre retiré"""
+        kept = int(np.searchsorted(self.times, np.datetime64(pd.Timestamp(cutoff)), side='right'))
+        removed = len(self) - kept
+        self.end = self.start + kept
+        return removed
+
+    def _reserve(self, count):
+        """Compacte le tampon au début, en doublant la capacité s'il est plus d'à moitié plein"""
+        size = len(self)
+        capacity = self.capacity
+        if size + count > capacity // 2:
+            capacity = max(2 * (size + count), self.min_capacity)
+        for name, buffer in self.buffers.items():
+            compacted = np.empty(capacity, dtype=buffer.dtype) if capacity != len(buffer) else buffer
+            compacted[:size] = buffer[self.start:self.end]
+            self.buffers[name] = compacted
+        self.start, self.end = 0, size
+
+    def to_frame(self, after=None, until=None):
+        """Instantané DataFrame de la fenêtre, ou de ses lignes dans ]after, until] (copie indépendante du tampon)"""
+        first, stop = self.start, self.end
+        if after is not None:
+            first += int(np.searchsorted(self.times, np.datetime64(pd.Timestamp(after)), side='right'))
+        if until is not None:
+            stop = self.start + int(np.searchsorted(self.times, np.datetime64(pd.Timestamp(until)), side='right'))
+        return pd.DataFrame({name: buffer[first:max(first, stop)].copy()
+                             for name, buffer in self.buffers.items()})
+
+
+class TimeIndexedStore:
+    """Série triée indexée par date: toute fenêtre temporelle est une tranche O(log n) sans copie"""
+
+    def __init__(self, frame, time_column='datetime'):
+        index = pd.DatetimeIndex(frame[time_column]).rename(None)
+        if not index.is_monotonic_increasing:
+            raise ValueError("Les dates de la série doivent être triées")
+        self.time_column = time_column
+        self.frame = frame.set_index(index, drop=False)
+
+    def __len__(self):
+        return len(self.frame)
+
+    @property
+    def index(self):
+        return self.frame.index
+
+    def position(self, when, side='right'):
+        """Position d'insertion de `when` dans l'index (recherche dichotomique)"""
+        return int(self.index.searchsorted(pd.Timestamp(when), side=side))
+
+    def window(self, start=None, end=None):
+        """Lignes de dates dans [start, end] (bornes optionnelles), en tranche positionnelle"""
+        first = 0 if start is None else self.position(start, side='left')
+        stop = len(self) if end is None else self.position(end, side='right')
+        return self.frame.iloc[first:stop]
+
+    def last(self, duration, end=None):
+        """Fenêtre de `duration` se terminant à `end` (par défaut, à la dernière date)"""
+        end = self.index[-1] if end is None else pd.Timestamp(end)
+        return self.window(end - duration + pd.Timedelta(1, 'ns'), end)
+
+    def next(self, duration, start):
+        """Fenêtre de `duration` commençant strictement après `start`"""
+        start = pd.Timestamp(start)
+        return self.window(start + pd.Timedelta(1, 'ns'), start + duration)
@@ -0,0 +1,139 @@
+# weather_sources.py
+"""Sources de données météo interchangeables pour les dashboards Ventusky.
+
+Par défaut les dashboards utilisent leurs générateurs simulés
+(`SyntheticWeatherSource`). `HttpWeatherSource` récupère des séries horaires
+JSON pour plusieurs stations en parallèle via un client HTTP asynchrone
+mutualisé (httpx). Format attendu pour `GET {base_url}/observations?station=ID`:
+
+    {"station": "ID", "hourly": {"datetime": ["2025-10-20T00:00", ...],
+                                 "temperature": [...], "pressure": [...], ...}}
+
+Le paramètre optionnel `since=2025-10-20T00:00` limite la réponse aux heures
+postérieures (mise à jour incrémentale).
+
+Voir `weather_stub_server.py` pour un serveur local de substitution.
+"""
+import asyncio
+import os
+
+import pandas as pd
+
+from stations import StationArray, default_network_window, default_station_ids, generate_station_array
+
+try:
+    import httpx
+except ImportError:  # dépendance optionnelle, requise uniquement pour HttpWeatherSource
+    httpx = None
+
+
+class WeatherDataSource:
+    """Interface commune des fournisseurs de données météo"""
+
+    # Station dont la série alimente les panneaux mono-station
+    primary_station = "default"
+    # Les heures futures (prévisions) sont-elles révisées d'une acquisition à l'autre ?
+    revises_forecasts = True
+
+    def fetch_observations(self, since=None):
+        """Retourne {station: DataFrame horaire avec colonne 'datetime'}.
+
+        Si `since` est fourni, seules les heures postérieures sont demandées
+        (mise à jour incrémentale).
+        """
+        raise NotImplementedError
+
+    def fetch_station_array(self, observations=None, since=None):
+        """Bloc station × temps × variable de tout le réseau (réutilise `observations` si fourni)"""
+        return StationArray.from_frames(observations or self.fetch_observations(since))
+
+
+class SyntheticWeatherSource(WeatherDataSource):
+    """Fournisseur par défaut s'appuyant sur un générateur de données simulées"""
+
+    # Une prévision simulée régénérée ne serait que du bruit: seules les heures nouvelles sont produites
+    revises_forecasts = False
+
+    def __init__(self, generator, n_stations=50, days_back=14, days_forward=7):
+        self.generator = generator
+        self.n_stations = n_stations
+        self.days_back = days_back
+        self.days_forward = days_forward
+
+    def fetch_observations(self, since=None):
+        data = self.generator() if since is None else self.generator(start=since + pd.Timedelta(hours=1))
+        return {self.primary_station: data}
+
+    def fetch_station_array(self, observations=None, since=None):
+        start, end = default_network_window(self.days_back, self.days_forward)
+        if since is not None:
+            start = since + pd.Timedelta(hours=1)
+        return generate_station_array(default_station_ids(self.n_stations), start, end)
+
+
+class HttpWeatherSource(WeatherDataSource):
+    """Fournisseur HTTP: téléchargements concurrents avec pool de connexions, timeouts et retries"""
+
+    def __init__(self, base_url, stations, timeout=10.0, retries=3, backoff=0.5,
+                 max_connections=20):
+        if httpx is None:
+            raise ImportError("HttpWeatherSource nécessite httpx (pip install httpx)")
+        if not stations:
+            raise ValueError("Au moins une station est requise")
+        self.base_url = base_url.rstrip('/')
+        self.stations = list(stations)
+        self.primary_station = self.stations[0]
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_connections = max_connections
+
+    def fetch_observations(self, since=None):
+        return asyncio.run(self.fetch_all(self.stations, since))
+
+    async def fetch_all(self, stations, since=None):
+        """Récupère toutes les stations en parallèle sur un même client (pool partagé)"""
+        limits = httpx.Limits(max_connections=self.max_connections,
+                              max_keepalive_connections=self.max_connections)
+        async with httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout,
+                                     limits=limits) as client:
+            payloads = await asyncio.gather(*(self.fetch_station(client, station, since)
+                                              for station in stations))
+        return {station: self.parse_payload(payload)
+                for station, payload in zip(stations, payloads)}
+
+    async def fetch_station(self, client, station, since=None):
+        """Récupère une station avec retries et backoff exponentiel"""
+        params = {'station': station}
+        if since is not None:
+            params['since'] = since.strftime('%Y-%m-%dT%H:%M')
+        for attempt in range(self.retries + 1):
+            try:
+                response = await client.get("/observations", params=params)
+                if response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                error = httpx.HTTPStatusError(f"HTTP {response.status_code} pour {station}",
+                                              request=response.request, response=response)
+            except httpx.TransportError as exc:
+                error = exc
+            if attempt < self.retries:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        raise error
+
+    @staticmethod
+    def parse_payload(payload):
+        """Convertit la réponse JSON d'une station en DataFrame trié par date"""
+        frame = pd.DataFrame(payload['hourly'])
+        frame['datetime'] = pd.to_datetime(frame['datetime'])
+        return frame.sort_values('datetime', ignore_index=True)
+
+
+def create_data_source():
+    """Source configurée par l'environnement (VENTUSKY_API_URL, VENTUSKY_STATIONS), sinon None"""
+    base_url = os.environ.get("VENTUSKY_API_URL")
+    if not base_url:
+        return None
+    stations = [s.strip() for s in os.environ.get("VENTUSKY_STATIONS", "default").split(',') if s.strip()]
+    return HttpWeatherSource(base_url, stations,
+                             timeout=float(os.environ.get("VENTUSKY_API_TIMEOUT", 10)))
@@ -0,0 +1,91 @@
+# weather_stub_server.py
+"""Serveur local de substitution pour tester HttpWeatherSource sans accès réseau.
+
+    python weather_stub_server.py --port 8765 --delay 0.05 --fail-rate 0.1
+    VENTUSKY_API_URL=http://localhost:8765 VENTUSKY_STATIONS=974-01,974-02 streamlit run DashboardPro.py
+"""
+import argparse
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from stations import default_network_window, generate_station_array
+
+
+def generate_station_payload(station, days_back=14, days_forward=7, since=None):
+    """Génère une série horaire simulée, stable pour une station et une heure donnée"""
+    start, end = default_network_window(days_back, days_forward)
+    if since is not None:
+        start = max(start, since + timedelta(hours=1))
+    seed = zlib.crc32(f"{station}{end:%Y%m%d%H}".encode())
+    array = generate_station_array([station], start, end, seed=seed)
+    hourly = {'datetime': array.times.strftime('%Y-%m-%dT%H:%M').tolist()}
+    hourly.update({variable: np.round(array.variable(variable)[0].astype(np.float64), 2).tolist()
+                   for variable in array.variables})
+    return {'station': station, 'hourly': hourly}
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    """Répond à /observations?station=ID[&since=ISO] et /health"""
+
+    delay = 0.0
+    fail_rate = 0.0
+    rng = np.random.default_rng()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/health':
+            return self.send_json(200, {'status': 'ok'})
+        if url.path != '/observations':
+            return self.send_json(404, {'error': 'not found'})
+
+        if self.delay:
+            time.sleep(self.delay)
+        if self.rng.random() < self.fail_rate:
+            return self.send_json(503, {'error': 'indisponible'})
+
+        query = parse_qs(url.query)
+        station = query.get('station', ['default'])[0]
+        since = datetime.fromisoformat(query['since'][0]) if 'since' in query else None
+        self.send_json(200, generate_station_payload(station, since=since))
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, delay=0.0, fail_rate=0.0):
+    """Démarre le serveur dans un thread; retourne (serveur, url de base)"""
+    handler = type('ConfiguredStubWeatherHandler', (StubWeatherHandler,),
+                   {'delay': delay, 'fail_rate': fail_rate})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help="latence simulée (s)")
+    parser.add_argument('--fail-rate', type=float, default=0.0, help="proportion de réponses 503")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(args.port, args.delay, args.fail_rate)
+    print(f"Serveur météo de substitution sur {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
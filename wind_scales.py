@@ -0,0 +1,80 @@
+# wind_scales.py
+"""Classification vectorisée des vitesses de vent selon des échelles configurables.
+
+Chaque échelle est une liste de seuils croissants (km/h) et les libellés des
+classes qu'ils délimitent; le classement se fait par `np.searchsorted`, sur
+des tableaux NumPy, des Series pandas ou des grilles de n'importe quelle forme
+(`codes` conserve la forme de la grille, `classify` l'aplatit).
+"""
+import numpy as np
+import pandas as pd
+
+
+class WindScale:
+    """Échelle de vent: `thresholds[i]` est la vitesse minimale de la classe `labels[i + 1]`"""
+
+    def __init__(self, name, thresholds, labels):
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        if np.any(np.diff(thresholds) <= 0):
+            raise ValueError(f"Seuils de l'échelle {name} non strictement croissants")
+        if len(labels) != len(thresholds) + 1:
+            raise ValueError(f"L'échelle {name} attend {len(thresholds) + 1} libellés")
+        self.name = name
+        self.thresholds = thresholds
+        self.labels = list(labels)
+
+    def codes(self, wind_speeds):
+        """Codes de classe (int8) de même forme que l'entrée; -1 pour les valeurs manquantes"""
+        values = np.asarray(wind_speeds, dtype=np.float64)
+        codes = np.searchsorted(self.thresholds, values, side='right')
+        return np.where(np.isnan(values), -1, codes).astype(np.int8)
+
+    def classify(self, wind_speeds):
+        """Catégories ordonnées; une Series en entrée donne une Series de même index.
+
+        Un Categorical n'a qu'une dimension: une grille est aplatie (ordre C),
+        `codes` donne les classes sous la forme de la grille.
+        """
+        codes = self.codes(wind_speeds).ravel()
+        categories = pd.Categorical.from_codes(codes, categories=self.labels, ordered=True)
+        if isinstance(wind_speeds, pd.Series):
+            return pd.Series(categories, index=wind_speeds.index, name=wind_speeds.name)
+        return categories
+
+    def label(self, wind_speed):
+        """Libellé d'une vitesse isolée"""
+        code = int(self.codes(wind_speed))
+        return self.labels[code] if code >= 0 else None
+
+
+# Échelle simplifiée du dashboard standard
+BEAUFORT_SIMPLIFIED = WindScale(
+    "beaufort_simplifiee",
+    [50, 63, 89, 118],
+    ["Vent fort", "Coup de vent", "Tempête", "Tempête Violente", "Ouragan"]
+)
+
+# Échelle de Beaufort complète (forces 0 à 12)
+BEAUFORT = WindScale(
+    "beaufort",
+    [1, 6, 12, 20, 29, 39, 50, 62, 75, 89, 103, 118],
+    ["Calme", "Très légère brise", "Légère brise", "Petite brise", "Jolie brise", "Bonne brise",
+     "Vent frais", "Grand frais", "Coup de vent", "Fort coup de vent", "Tempête",
+     "Violente tempête", "Ouragan"]
+)
+
+# Échelle de Saffir-Simpson améliorée du dashboard Pro+
+SAFFIR_SIMPSON = WindScale(
+    "saffir_simpson",
+    [63, 119, 154, 178, 209, 252],
+    ["Dépression Tropicale", "Tempête Tropicale", "Catégorie 1", "Catégorie 2",
+     "Catégorie 3", "Catégorie 4", "Catégorie 5"]
+)
+
+SCALES = {scale.name: scale for scale in (BEAUFORT_SIMPLIFIED, BEAUFORT, SAFFIR_SIMPSON)}
+
+
+def classify_wind(wind_speeds, scale="saffir_simpson"):
+    """Retourne (codes, libellés) pour une échelle donnée par son nom ou une WindScale"""
+    scale = SCALES[scale] if isinstance(scale, str) else scale
+    return scale.codes(wind_speeds), scale.labels